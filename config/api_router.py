@@ -1,8 +1,11 @@
 from django.conf import settings
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 from rest_framework.routers import SimpleRouter
 
 from geosocial.users.api.views import UserViewSet
+from geosocial.maps.api import async_views
+from geosocial.maps.api.streams import pin_event_stream
 from geosocial.maps.api.views import (
     MapViewSet, MapPinViewSet, MapCollaboratorViewSet, ChoicesViewSet
 )
@@ -17,4 +20,13 @@ router.register("choices", ChoicesViewSet, basename="choices")
 
 
 app_name = "api"
-urlpatterns = router.urls
+urlpatterns = [
+    # Answers 501 unless the request comes through the ASGI application
+    path("maps/<slug:slug>/events/", pin_event_stream, name="map-events"),
+    # Async ORM implementations of the read-heavy endpoints, for ASGI servers
+    path("async/maps/", async_views.map_list, name="async-map-list"),
+    path("async/maps/public_maps/", async_views.public_maps, name="async-map-public-maps"),
+    path("async/maps/<slug:slug>/", async_views.map_detail, name="async-map-detail"),
+    path("async/pins/by_map/", async_views.pins_by_map, name="async-mappin-by-map"),
+    *router.urls,
+]
@@ -0,0 +1,23 @@
+"""
+ASGI config for GeoSocial project.
+
+This module exposes the ASGI application as a module-level variable named
+``application``. Serve it with an ASGI server (for example ``uvicorn
+config.asgi:application``) to run async views such as the pin event stream
+without tying up a worker per open connection.
+
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from django.core.asgi import get_asgi_application
+
+# This allows easy placement of apps within the interior
+# geosocial directory.
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(BASE_DIR / "geosocial"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+application = get_asgi_application()
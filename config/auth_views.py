@@ -1,22 +1,41 @@
+from allauth.account import app_settings as allauth_account_settings
+from allauth.account.models import EmailAddress
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 
 
 @method_decorator(csrf_exempt, name='dispatch')
 class CustomObtainAuthToken(ObtainAuthToken):
-    """Custom auth token view that's exempt from CSRF protection."""
-    
+    """
+    Custom auth token view that's exempt from CSRF protection.
+
+    Logins are throttled per client under the ``auth_token`` rate and, like
+    the dj-rest-auth login, require a verified email address when email
+    verification is mandatory.
+    """
+
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'auth_token'
+
     def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data,
                                            context={'request': request})
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']
+        if (
+            allauth_account_settings.EMAIL_VERIFICATION
+            == allauth_account_settings.EmailVerificationMethod.MANDATORY
+            and not EmailAddress.objects.filter(user=user, verified=True).exists()
+        ):
+            raise ValidationError({'non_field_errors': ['E-mail is not verified.']})
         token, created = Token.objects.get_or_create(user=user)
         return Response({
             'token': token.key,
             'user_id': user.pk,
             'email': user.email
-        })
\ No newline at end of file
+        })
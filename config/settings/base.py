@@ -315,6 +315,9 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_THROTTLE_RATES": {
+        "auth_token": env("DJANGO_API_TOKEN_LOGIN_RATE", default="20/minute"),
+    },
 }
 
 # dj-rest-auth
@@ -324,6 +327,8 @@ REST_AUTH = {
     "SESSION_LOGIN": True,
     "USER_DETAILS_SERIALIZER": "geosocial.users.api.serializers.UserSerializer",
 }
+# Expose the throttled token login at api/auth-token/ used by scripted clients
+API_TOKEN_LOGIN = env.bool("DJANGO_API_TOKEN_LOGIN", False)
 
 # django-cors-headers - https://github.com/adamchainz/django-cors-headers#setup
 CORS_URLS_REGEX = r"^/api/.*$"
@@ -363,3 +368,40 @@ WEBPACK_LOADER = {
 }
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Maximum number of pins returned for a single viewport (``bbox``) query.
+MAPS_BBOX_PIN_LIMIT = env.int("MAPS_BBOX_PIN_LIMIT", default=5000)
+# Clustering grid resolution: number of cells along each axis of a map tile.
+MAPS_CLUSTER_CELLS_PER_TILE = env.int("MAPS_CLUSTER_CELLS_PER_TILE", default=8)
+# Seconds clients may cache a map's vector tiles before revalidating.
+MAPS_TILE_MAX_AGE = env.int("MAPS_TILE_MAX_AGE", default=60)
+# Radius in metres of the first search area of a nearest-pins query.
+MAPS_NEAREST_INITIAL_RADIUS_M = env.float("MAPS_NEAREST_INITIAL_RADIUS_M", default=1000.0)
+# Largest radius_m of a pin listing; every pin inside the circle is measured.
+MAPS_MAX_RADIUS_M = env.float("MAPS_MAX_RADIUS_M", default=50000.0)
+# Maximum number of pins a nearest-pins query may ask for.
+MAPS_NEAREST_MAX_K = env.int("MAPS_NEAREST_MAX_K", default=100)
+# Default and maximum number of pins per page of a pin listing.
+MAPS_PIN_PAGE_SIZE = env.int("MAPS_PIN_PAGE_SIZE", default=100)
+MAPS_PIN_MAX_PAGE_SIZE = env.int("MAPS_PIN_MAX_PAGE_SIZE", default=1000)
+# Rows fetched per round trip when streaming a map export.
+MAPS_EXPORT_CHUNK_SIZE = env.int("MAPS_EXPORT_CHUNK_SIZE", default=2000)
+# Maximum number of pins in one bulk create request, and rows per INSERT.
+MAPS_BULK_PIN_LIMIT = env.int("MAPS_BULK_PIN_LIMIT", default=5000)
+MAPS_BULK_CREATE_BATCH_SIZE = env.int("MAPS_BULK_CREATE_BATCH_SIZE", default=1000)
+# Seconds a user's owned/collaborated map ids stay cached; signals invalidate earlier.
+MAPS_ACCESS_CACHE_TIMEOUT = env.int("MAPS_ACCESS_CACHE_TIMEOUT", default=300)
+# Seconds a cached public response is kept; writes make entries stale through the map version.
+MAPS_RESPONSE_CACHE_TIMEOUT = env.int("MAPS_RESPONSE_CACHE_TIMEOUT", default=600)
+# Maximum number of changed pins returned by one sync request.
+MAPS_SYNC_PAGE_SIZE = env.int("MAPS_SYNC_PAGE_SIZE", default=1000)
+# Seconds a completed sync cursor is rewound to catch transactions that committed late.
+MAPS_SYNC_OVERLAP_SECONDS = env.int("MAPS_SYNC_OVERLAP_SECONDS", default=5)
+# Days pin tombstones are kept; older sync cursors must resync from scratch.
+MAPS_TOMBSTONE_RETENTION_DAYS = env.int("MAPS_TOMBSTONE_RETENTION_DAYS", default=30)
+# Redis URL carrying real-time pin events between workers; empty uses an in-process broker.
+MAPS_EVENTS_REDIS_URL = env("MAPS_EVENTS_REDIS_URL", default="")
+# Seconds between heartbeats on an idle pin event stream, and client reconnect delay in ms.
+MAPS_EVENT_HEARTBEAT_SECONDS = env.int("MAPS_EVENT_HEARTBEAT_SECONDS", default=15)
+MAPS_EVENT_RETRY_MS = env.int("MAPS_EVENT_RETRY_MS", default=3000)
+# Seconds between access re-checks on an open pin event stream, however busy it is.
+MAPS_EVENT_ACCESS_CHECK_SECONDS = env.int("MAPS_EVENT_ACCESS_CHECK_SECONDS", default=30)
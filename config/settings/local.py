@@ -79,3 +79,5 @@ INSTALLED_APPS += ["django_extensions"]
 WEBPACK_LOADER["DEFAULT"]["CACHE"] = not DEBUG
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Token login for the load_test command against the development server
+API_TOKEN_LOGIN = True
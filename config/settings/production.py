@@ -39,6 +39,9 @@ CACHES = {
     },
 }
 
+# Real-time pin events go through Redis so every worker sees every write.
+MAPS_EVENTS_REDIS_URL = env("MAPS_EVENTS_REDIS_URL", default=REDIS_URL)
+
 # SECURITY
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#secure-proxy-ssl-header
@@ -39,3 +39,5 @@ MEDIA_URL = "http://media.testserver/"
 WEBPACK_LOADER["DEFAULT"]["LOADER_CLASS"] = "webpack_loader.loaders.FakeWebpackLoader"  # noqa: F405
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Token login of the load_test command
+API_TOKEN_LOGIN = True
@@ -41,6 +41,12 @@ urlpatterns += [
     ),
 ]
 
+if settings.API_TOKEN_LOGIN:
+    # Token login for scripted API clients such as the load_test command
+    urlpatterns += [
+        path("api/auth-token/", CustomObtainAuthToken.as_view(), name="api-auth-token"),
+    ]
+
 if settings.DEBUG:
     # This allows the error pages to be debugged during development, just visit
     # these url in browser to see how these error pages look like.
@@ -76,14 +76,14 @@ function MapDetailPage() {
           </Card>
 
           {/* Pins List */}
-          {map.pins && map.pins.length > 0 && (
+          {map.pins && map.pins.results.length > 0 && (
             <Card fluid style={{ marginTop: '1rem' }}>
               <Card.Content>
-                <Card.Header>Pins ({map.pins.length})</Card.Header>
+                <Card.Header>Pins ({map.pins_count})</Card.Header>
               </Card.Content>
               <Card.Content style={{maxHeight: '400px', overflowY: 'auto'}}>
                 <List divided>
-                  {map.pins.map((pin) => (
+                  {map.pins.results.map((pin) => (
                     <List.Item key={pin.id}>
                       <List.Content>
                         <List.Header>{pin.name}</List.Header>
@@ -108,7 +108,7 @@ function MapDetailPage() {
                 <Header as="h4">Interactive Map</Header>
                 <p>Map component will be implemented here using React Leaflet</p>
                 <p>Latitude/Longitude coordinates will be displayed for pins:</p>
-                {map.pins && map.pins.map((pin) => (
+                {map.pins && map.pins.results.map((pin) => (
                   <div key={pin.id} style={{ fontSize: '0.9em', margin: '0.5rem 0' }}>
                     {pin.name}: {pin.latitude}, {pin.longitude}
                   </div>
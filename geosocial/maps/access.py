@@ -0,0 +1,91 @@
+"""
+Per-user map access sets.
+
+The ids of the maps a user owns and collaborates on are cached (in Redis in
+production) and memoized on the request, so permission checks and access
+filters are set lookups instead of a join on collaborators plus
+``DISTINCT``. Signals in :mod:`geosocial.maps.signals` invalidate a user's
+entry whenever their maps or collaborations change.
+"""
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from geosocial.maps.models import Map, MapCollaborator
+
+
+class MapAccess(NamedTuple):
+    """Ids of the maps a user owns or collaborates on."""
+    owned: frozenset
+    collaborated: frozenset
+
+    @property
+    def members(self):
+        """Ids of maps the user owns or collaborates on."""
+        return self.owned | self.collaborated
+
+    def is_owner(self, map_instance):
+        """Check whether the user owns a map."""
+        return map_instance.pk in self.owned
+
+    def is_member(self, map_instance):
+        """Check whether the user owns or collaborates on a map."""
+        return map_instance.pk in self.owned or map_instance.pk in self.collaborated
+
+    def can_view(self, map_instance):
+        """Check whether the user may view a map and its pins."""
+        return map_instance.public_view or self.is_member(map_instance)
+
+    def can_contribute(self, map_instance):
+        """Check whether the user may add pins to a map."""
+        return map_instance.public_contribution or self.is_member(map_instance)
+
+    def visible_maps_q(self, prefix=''):
+        """Filter matching maps the user may view."""
+        return Q(**{f'{prefix}pk__in': self.members}) | Q(**{f'{prefix}public_view': True})
+
+
+NO_ACCESS = MapAccess(frozenset(), frozenset())
+
+
+def _cache_key(user_id):
+    """Cache key of a user's access sets."""
+    return f'maps:access:{user_id}'
+
+
+def get_map_access(user):
+    """Load a user's map access sets from the cache or the database."""
+    if not user.is_authenticated:
+        return NO_ACCESS
+    key = _cache_key(user.pk)
+    cached = cache.get(key)
+    if cached is None:
+        cached = (
+            list(Map.objects.filter(owner=user).values_list('pk', flat=True)),
+            list(MapCollaborator.objects.filter(user=user).values_list('map_id', flat=True)),
+        )
+        cache.set(key, cached, settings.MAPS_ACCESS_CACHE_TIMEOUT)
+    return MapAccess(frozenset(cached[0]), frozenset(cached[1]))
+
+
+def request_map_access(request):
+    """Return the current user's map access, memoized for the request."""
+    access = getattr(request, '_map_access', None)
+    if access is None:
+        access = request._map_access = get_map_access(request.user)
+    return access
+
+
+def invalidate_map_access(*user_ids):
+    """
+    Drop cached access sets of users.
+
+    The entries are deleted immediately and again when the transaction
+    commits, so a concurrent request cannot re-cache the old sets in between.
+    """
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,182 @@
+"""
+Async implementations of the read-heavy maps API endpoints.
+
+Each view answers the same requests as its ``MapViewSet``/``MapPinViewSet``
+counterpart, with the same authentication, permissions, sparse fieldsets,
+validators and response cache, but reads through Django's async ORM, so
+under ASGI a slow query no longer ties up a whole worker. Responses are
+always JSON. The views are mounted under ``/api/async/``.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from geosocial.maps.access import get_map_access, request_map_access
+from geosocial.maps.models import Map
+from geosocial.maps.response_cache import acached_response
+
+from .pagination import MapPinCursorPagination
+from .reads import PUBLIC_MAPS_LATEST, PinListing, maps_for_fieldset, public_maps_version
+from .serializers import (
+    MapCollaboratorSerializer, MapDetailSerializer, MapPinValuesSerializer, MapSerializer, by_map_url
+)
+from .views import fieldset_wants, not_modified_response, parse_fieldset, set_map_validators
+
+
+def json_response(data, status=200):
+    """Render ``data`` like the API's JSON renderer."""
+    return HttpResponse(JSONRenderer().render(data), content_type='application/json', status=status)
+
+
+async def authenticate(request):
+    """Authenticate like the API does: a token header, else the session."""
+    try:
+        credentials = await sync_to_async(TokenAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    if credentials is not None:
+        return credentials[0]
+    return await request.auser()
+
+
+def async_api_view(view):
+    """
+    Wrap an async read view with the API's authentication.
+
+    Only ``GET`` is allowed and the user must be authenticated. The user's
+    map access is loaded up front, so ``request_map_access`` does no I/O.
+    Async views cannot run inside ``ATOMIC_REQUESTS``, and reads need no
+    transaction, so they are excluded from it.
+    """
+    @transaction.non_atomic_requests
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        user = await authenticate(request)
+        if user is None or not user.is_authenticated:
+            return json_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+        request.user = user
+        request._map_access = await sync_to_async(get_map_access)(user)
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@async_api_view
+async def map_list(request):
+    """List maps the user owns, collaborates on, or that are public."""
+    fieldset = parse_fieldset(request.GET)
+    maps = maps_for_fieldset(
+        Map.objects.filter(request_map_access(request).visible_maps_q()), fieldset_wants(fieldset, 'owner')
+    )
+    return json_response(MapSerializer([map_instance async for map_instance in maps], many=True, **fieldset).data)
+
+
+@async_api_view
+async def map_detail(request, slug):
+    """Get a map with its extent, first page of pins and collaborators."""
+    map_instance = await (
+        Map.objects.filter(request_map_access(request).visible_maps_q(), slug=slug)
+        .select_related('owner').afirst()
+    )
+    if map_instance is None:
+        return json_response({'detail': 'No Map matches the given query.'}, status=404)
+
+    response = not_modified_response(request, map_instance)
+    if response is None:
+        response = json_response(await map_detail_data(request, map_instance))
+    return set_map_validators(response, map_instance)
+
+
+async def map_detail_data(request, map_instance):
+    """Build the ``MapDetailSerializer`` representation of a map with the async ORM."""
+    fieldset = parse_fieldset(request.GET)
+    data = MapSerializer(map_instance, **fieldset).data
+    if fieldset_wants(fieldset, 'extent'):
+        data['extent'] = None
+        if map_instance.pins_count:
+            data['extent'] = MapDetailSerializer.extent_from(
+                await map_instance.pins.aaggregate(**MapDetailSerializer.EXTENT_AGGREGATES)
+            )
+    if fieldset_wants(fieldset, 'pins'):
+        paginator = MapPinCursorPagination()
+        pin_values = MapPinValuesSerializer()
+        page = await paginator.apaginate_queryset(
+            pin_values.values(map_instance.pins.all(), 'timestamp', 'id'), Request(request)
+        )
+        # Continue on by_map, which pages the same ordering
+        paginator.base_url = by_map_url(request, map_instance)
+        data['pins'] = {
+            'next': paginator.get_next_link(),
+            'results': pin_values.to_representation(page),
+        }
+    if fieldset_wants(fieldset, 'collaborators'):
+        collaborators = map_instance.collaborators.select_related('user')
+        data['collaborators'] = MapCollaboratorSerializer(
+            [collaborator async for collaborator in collaborators], many=True
+        ).data
+    return data
+
+
+@async_api_view
+async def public_maps(request):
+    """List public maps, from the response cache while none of them changes."""
+    maps = Map.objects.filter(public_view=True)
+    version = public_maps_version(await maps.aaggregate(**PUBLIC_MAPS_LATEST))
+
+    async def build_response():
+        fieldset = parse_fieldset(request.GET)
+        rows = maps_for_fieldset(maps, fieldset_wants(fieldset, 'owner'))
+        return json_response(MapSerializer([map_instance async for map_instance in rows], many=True, **fieldset).data)
+
+    return await acached_response(request, 'public_maps', version, build_response)
+
+
+@async_api_view
+async def pins_by_map(request):
+    """Get pins for a specific map, optionally limited to a bbox or radius."""
+    map_slug = request.GET.get('map_slug')
+    if not map_slug:
+        return json_response({'error': 'map_slug parameter is required'}, status=400)
+    map_instance = await Map.objects.filter(slug=map_slug).afirst()
+    if map_instance is None:
+        return json_response({'detail': 'No Map matches the given query.'}, status=404)
+    if not request_map_access(request).can_view(map_instance):
+        return json_response({'detail': "You don't have permission to view this map."}, status=403)
+
+    response = not_modified_response(request, map_instance)
+    if response is None:
+        if map_instance.public_view:
+            # Public pin listings are the same for every viewer
+            response = await acached_response(
+                request, f'pins:{map_instance.pk}', map_instance.version,
+                lambda: pins_response(request, map_instance)
+            )
+        else:
+            response = await pins_response(request, map_instance)
+    return set_map_validators(response, map_instance)
+
+
+async def pins_response(request, map_instance):
+    """Async counterpart of ``MapPinViewSet.pins_response`` for one map."""
+    try:
+        listing = PinListing(map_instance.pins.all(), request.GET, parse_fieldset(request.GET))
+    except ValueError as exc:
+        return json_response({'error': str(exc)}, status=400)
+
+    if listing.paginated:
+        paginator = MapPinCursorPagination()
+        page = await paginator.apaginate_queryset(listing.page_rows(), Request(request))
+        return json_response(paginator.get_paginated_response(listing.pin_values.to_representation(page)).data)
+    if listing.near is None:
+        rows = [row async for row in listing.capped_rows()]
+    else:
+        matches = listing.matches([candidate async for candidate in listing.candidates()])
+        rows = listing.with_distances(matches, [pin async for pin in listing.matched_pins(matches)])
+    return json_response(listing.capped_data(rows))
@@ -0,0 +1,98 @@
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class MapPinCursorPagination(CursorPagination):
+    """
+    Keyset pagination for pin listings, newest first.
+
+    Pages are addressed by an opaque cursor holding the ``(timestamp, id)``
+    of the pin they continue from, and read with a keyset filter on both
+    columns, so deep pages are served from the ``(map, timestamp, id)``
+    index as cheaply as the first one, even when many pins share a
+    timestamp, and no ``COUNT(*)`` or ``OFFSET`` is issued.
+    """
+    ordering = ('-timestamp', '-id')
+    page_size = settings.MAPS_PIN_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.MAPS_PIN_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_rows(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async counterpart of ``paginate_queryset``; ``request`` must be a DRF ``Request``."""
+        return self.paginate_rows([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """Narrow ``queryset`` to the requested page plus one row telling whether another follows."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        self.position = None if self.cursor is None else self.decode_position(self.cursor.position)
+
+        if self.reversed:
+            queryset = queryset.order_by('timestamp', 'id')
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if self.position is not None:
+            timestamp, pk = self.position
+            if self.reversed:
+                after = Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=pk)
+                bound = Q(timestamp__gte=timestamp)
+            else:
+                after = Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk)
+                bound = Q(timestamp__lte=timestamp)
+            # The redundant bound lets the database range-scan the index
+            queryset = queryset.filter(bound, after)
+        return queryset[:self.page_size + 1]
+
+    def paginate_rows(self, rows):
+        """Turn the rows read by ``page_queryset`` into the page and its navigation state."""
+        self.page = rows[:self.page_size]
+        more = len(rows) > self.page_size
+        if self.reversed:
+            self.page.reverse()
+            self.has_next, self.has_previous = self.position is not None, more
+        else:
+            self.has_next, self.has_previous = more, self.position is not None
+        return self.page
+
+    @property
+    def reversed(self):
+        return self.cursor is not None and self.cursor.reverse
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self.encode_position(self.page[-1]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self.encode_position(self.page[0]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    @staticmethod
+    def encode_position(row):
+        """Cursor position of a pin, a model instance or a ``values()`` row."""
+        if isinstance(row, dict):
+            return f"{row['timestamp'].isoformat()}|{row['id']}"
+        return f'{row.timestamp.isoformat()}|{row.pk}'
+
+    def decode_position(self, position):
+        """Parse a cursor position into ``(timestamp, id)``; ``None`` for a cursor without one."""
+        if position is None:
+            return None
+        try:
+            timestamp, pk = position.split('|')
+            return datetime.fromisoformat(timestamp), uuid.UUID(pk)
+        except ValueError as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
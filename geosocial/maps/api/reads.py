@@ -0,0 +1,99 @@
+"""
+Query building and validation shared by the sync and async read endpoints.
+
+The ``MapViewSet``/``MapPinViewSet`` actions and their counterparts in
+:mod:`geosocial.maps.api.async_views` build their querysets and responses
+here, and only differ in evaluating them with the sync or the async ORM.
+"""
+from django.conf import settings
+from django.db.models import Count, Max
+
+from geosocial.maps.models import MapPin
+from geosocial.maps.spatial import BoundingBox, circle_candidates, parse_near, within_radius
+
+from .serializers import MapPinDistanceSerializer, MapPinValuesSerializer
+
+# Aggregates identifying the current state of the public map listing
+PUBLIC_MAPS_LATEST = {'count': Count('pk'), 'updated_at': Max('updated_at')}
+
+
+def public_maps_version(latest):
+    """Response cache version of the public map listing from its ``PUBLIC_MAPS_LATEST``."""
+    return f"{latest['count']}-{latest['updated_at'] and latest['updated_at'].timestamp()}"
+
+
+def maps_for_fieldset(maps, wants_owner):
+    """Join the owner onto a map queryset only when the fieldset renders it."""
+    return maps.select_related('owner') if wants_owner else maps
+
+
+class PinListing:
+    """
+    A pin listing request: a cursor-paginated page, a viewport or a radius.
+
+    With ``bbox=minLon,minLat,maxLon,maxLat`` only pins inside the viewport
+    are listed, and with ``near=lat,lon&radius_m=`` only pins within that
+    many metres of the point, nearest first and with their ``distance``.
+    Every pin in the circle is measured before the nearest are kept, so the
+    radius is capped at ``MAPS_MAX_RADIUS_M``.
+    Either way results are capped at ``MAPS_BBOX_PIN_LIMIT`` and wrapped as
+    ``{"truncated": ..., "results": [...]}``. The parameters are validated
+    on construction, which raises ``ValueError`` for malformed ones.
+    """
+
+    def __init__(self, queryset, params, fieldset):
+        self.fieldset = fieldset
+        self.pin_values = MapPinValuesSerializer(**fieldset)
+        self.limit = settings.MAPS_BBOX_PIN_LIMIT
+        bbox_param = params.get('bbox')
+        near_param = params.get('near')
+        self.paginated = bbox_param is None and near_param is None
+        self.near = None
+        if bbox_param is not None:
+            queryset = queryset.filter(BoundingBox.from_string(bbox_param).to_q())
+        if near_param is not None:
+            self.near = parse_near(near_param, params.get('radius_m'), settings.MAPS_MAX_RADIUS_M)
+        self.queryset = queryset
+
+    def page_rows(self):
+        """Value rows to paginate; the cursor is built from the ordering columns of each row."""
+        return self.pin_values.values(self.queryset, 'timestamp', 'id')
+
+    def capped_rows(self):
+        """Value rows of a viewport listing, one past the cap to tell when it is truncated."""
+        return self.pin_values.values(self.queryset)[:self.limit + 1]
+
+    def candidates(self):
+        """``(pk, latitude, longitude)`` rows of the pins in the bounding box of the radius."""
+        return circle_candidates(self.queryset, *self.near)
+
+    def matches(self, candidates):
+        """``(distance, pk)`` of the candidates within the radius, nearest first and one past the cap."""
+        return within_radius(candidates, *self.near)[:self.limit + 1]
+
+    @staticmethod
+    def matched_pins(matches):
+        """Queryset loading matched pins for ``MapPinDistanceSerializer``."""
+        return MapPin.objects.select_related('map', 'placed_by').filter(pk__in=[pk for _, pk in matches])
+
+    @staticmethod
+    def with_distances(matches, pins):
+        """Order loaded pins like their matches and set their ``distance``."""
+        found = {pin.pk: pin for pin in pins}
+        ordered = []
+        for distance, pk in matches:
+            pin = found[pk]
+            pin.distance = round(distance, 2)
+            ordered.append(pin)
+        return ordered
+
+    def capped_data(self, rows):
+        """Serialize capped viewport rows or radius pins with the truncation flag."""
+        if self.near is None:
+            results = self.pin_values.to_representation(rows[:self.limit])
+        else:
+            results = MapPinDistanceSerializer(rows[:self.limit], many=True, **self.fieldset).data
+        return {
+            'truncated': len(rows) > self.limit,
+            'results': results,
+        }
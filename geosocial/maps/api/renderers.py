@@ -0,0 +1,21 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class VectorTileRenderer(BaseRenderer):
+    """Renderer for pre-encoded Mapbox Vector Tiles."""
+    media_type = 'application/vnd.mapbox-vector-tile'
+    format = 'mvt'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Return tile bytes as-is; views render error payloads with ``JSONRenderer``."""
+        if isinstance(data, bytes):
+            return data
+        return b''
+
+
+class GeoJSONRenderer(JSONRenderer):
+    """Renderer advertising GeoJSON; exports stream their own body."""
+    media_type = 'application/geo+json'
+    format = 'geojson'
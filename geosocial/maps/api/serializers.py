@@ -1,12 +1,44 @@
-from rest_framework import serializers
+import decimal
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Max, Min
+from django.urls import reverse
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from geosocial.maps.models import Map, MapPin, MapCollaborator, MapStyleChoices, ContentTypeChoices, IconChoices
 
+from .pagination import MapPinCursorPagination
+
+
+def by_map_url(request, map_instance):
+    """Absolute URL of the ``by_map`` pin listing of a map."""
+    return request.build_absolute_uri(
+        f"{reverse('api:mappin-by-map')}?{urlencode({'map_slug': map_instance.slug})}"
+    )
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin for sparse fieldsets.
+
+    Accepts ``fields`` (names to keep) and ``omit`` (names to drop) keyword
+    arguments; dropped fields are never evaluated, so neither is the query
+    or lookup behind them. Unknown names are ignored.
+    """
 
-class MapSerializer(serializers.ModelSerializer):
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+
+class MapSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Map model."""
     owner = serializers.StringRelatedField(read_only=True)
-    pins_count = serializers.SerializerMethodField()
-    collaborators_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Map
@@ -15,18 +47,12 @@ class MapSerializer(serializers.ModelSerializer):
             'public_view', 'public_contribution', 'created_at', 
             'updated_at', 'pins_count', 'collaborators_count'
         ]
-        read_only_fields = ['id', 'owner', 'created_at', 'updated_at']
-    
-    def get_pins_count(self, obj):
-        """Get the number of pins on this map."""
-        return obj.pins.count()
-    
-    def get_collaborators_count(self, obj):
-        """Get the number of collaborators on this map."""
-        return obj.collaborators.count()
+        read_only_fields = [
+            'id', 'owner', 'created_at', 'updated_at', 'pins_count', 'collaborators_count'
+        ]
 
 
-class MapPinSerializer(serializers.ModelSerializer):
+class MapPinSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for MapPin model."""
     placed_by = serializers.StringRelatedField(read_only=True)
     map_name = serializers.CharField(source='map.name', read_only=True)
@@ -53,6 +79,132 @@ class MapPinSerializer(serializers.ModelSerializer):
         return value
 
 
+class MapPinValuesSerializer:
+    """
+    Fast read-only counterpart of ``MapPinSerializer`` for pin listings.
+
+    Rows come from ``QuerySet.values()`` instead of model instances, and each
+    output field is compiled once into a ``(name, column, converter)``
+    triple, so rendering a pin is one dict comprehension rather than a full
+    DRF field traversal. The output matches ``MapPinSerializer`` for the
+    same ``fields``/``omit``.
+    """
+    # Related fields rendered straight from a joined column
+    RELATED_COLUMNS = {
+        'map': 'map',
+        'map_name': 'map__name',
+        'placed_by': 'placed_by__username',
+    }
+
+    def __init__(self, fields=None, omit=None):
+        serializer = MapPinSerializer(fields=fields, omit=omit)
+        self.compiled = [
+            (name, self.RELATED_COLUMNS.get(name) or '__'.join(field.source_attrs), self._converter(field))
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        ]
+        self.columns = [column for _, column, _ in self.compiled]
+
+    @classmethod
+    def _converter(cls, field):
+        """Return the per-value conversion for a field, or ``None`` for identity."""
+        if isinstance(field, (serializers.CharField, serializers.ChoiceField, serializers.RelatedField)):
+            return None
+        if isinstance(field, serializers.UUIDField):
+            return str
+        if isinstance(field, serializers.DateTimeField):
+            return cls._datetime_converter(field)
+        if isinstance(field, serializers.DecimalField):
+            return cls._decimal_converter(field)
+        return field.to_representation
+
+    @staticmethod
+    def _datetime_converter(field):
+        """
+        Compile ``DateTimeField.to_representation`` for aware database values.
+
+        The output format and timezone are looked up once instead of per
+        value; uncommon formats fall back to the field itself.
+        """
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if output_format is None:
+            return None
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if output_format.lower() != ISO_8601 or field_timezone is None:
+            return field.to_representation
+
+        def convert(value):
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+
+    @staticmethod
+    def _decimal_converter(field):
+        """
+        Compile ``DecimalField.to_representation`` for ``Decimal`` database values.
+
+        The quantize exponent and context are built once instead of per value;
+        localized, normalized or unbounded fields fall back to the field itself.
+        """
+        coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        if field.decimal_places is None or field.localize or getattr(field, 'normalize_output', False):
+            return field.to_representation
+        exponent = decimal.Decimal(1).scaleb(-field.decimal_places)
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+        rounding = field.rounding
+
+        def convert(value):
+            value = value.quantize(exponent, rounding=rounding, context=context)
+            return format(value, 'f') if coerce_to_string else value
+        return convert
+
+    def values(self, queryset, *extra):
+        """Return ``queryset`` as value rows with the rendered and ``extra`` columns."""
+        return queryset.values(*dict.fromkeys([*self.columns, *extra]))
+
+    def to_representation(self, rows):
+        """Render value rows as pin dicts."""
+        compiled = self.compiled
+        return [
+            {
+                name: value if convert is None or value is None else convert(value)
+                for name, column, convert in compiled
+                for value in (row[column],)
+            }
+            for row in rows
+        ]
+
+
+class MapPinDistanceSerializer(MapPinSerializer):
+    """Serializer for MapPin search results with their distance in metres."""
+    distance = serializers.FloatField(read_only=True)
+
+    class Meta(MapPinSerializer.Meta):
+        fields = MapPinSerializer.Meta.fields + ['distance']
+
+
+class MapPinBulkItemSerializer(MapPinSerializer):
+    """Serializer for one pin of a bulk create; the map is given once for all pins."""
+
+    class Meta(MapPinSerializer.Meta):
+        fields = [
+            field for field in MapPinSerializer.Meta.fields
+            if field not in ('map', 'map_name')
+        ]
+
+
+class MapPinBulkCreateSerializer(serializers.Serializer):
+    """Serializer for a bulk create request: one map and a list of pins."""
+    map = serializers.PrimaryKeyRelatedField(queryset=Map.objects.all())
+    pins = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.MAPS_BULK_PIN_LIMIT
+    )
+
+
 class MapCollaboratorSerializer(serializers.ModelSerializer):
     """Serializer for MapCollaborator model."""
     user = serializers.StringRelatedField(read_only=True)
@@ -68,12 +220,58 @@ class MapCollaboratorSerializer(serializers.ModelSerializer):
 
 
 class MapDetailSerializer(MapSerializer):
-    """Detailed serializer for Map model with nested pins and collaborators."""
-    pins = MapPinSerializer(many=True, read_only=True)
-    collaborators = MapCollaboratorSerializer(many=True, read_only=True)
+    """
+    Detailed serializer for Map model.
+
+    Adds the pins' ``extent`` as ``[minLon, minLat, maxLon, maxLat]``, the
+    collaborators, and only the first page of pins as
+    ``{"next": ..., "results": [...]}``; ``next`` continues the listing on
+    the ``by_map`` endpoint.
+    """
+    extent = serializers.SerializerMethodField()
+    pins = serializers.SerializerMethodField()
+    collaborators = serializers.SerializerMethodField()
     
     class Meta(MapSerializer.Meta):
-        fields = MapSerializer.Meta.fields + ['pins', 'collaborators']
+        fields = MapSerializer.Meta.fields + ['extent', 'pins', 'collaborators']
+
+    # Aggregates of the pins' extent, in output order
+    EXTENT_AGGREGATES = {
+        'min_lon': Min('longitude'), 'min_lat': Min('latitude'),
+        'max_lon': Max('longitude'), 'max_lat': Max('latitude'),
+    }
+
+    @classmethod
+    def extent_from(cls, aggregates):
+        """Render the result of ``EXTENT_AGGREGATES``, ``None`` for a map without pins."""
+        if aggregates['min_lon'] is None:
+            return None
+        return [float(aggregates[key]) for key in cls.EXTENT_AGGREGATES]
+
+    def get_extent(self, obj):
+        """Get the bounding box of the map's pins, or ``None`` without pins."""
+        if not obj.pins_count:
+            return None
+        return self.extent_from(obj.pins.aggregate(**self.EXTENT_AGGREGATES))
+
+    def get_pins(self, obj):
+        """Get the first page of pins and a cursor link to the next one."""
+        request = self.context['request']
+        paginator = MapPinCursorPagination()
+        page = paginator.paginate_queryset(
+            obj.pins.select_related('placed_by'), request
+        )
+        # Continue on by_map, which pages the same ordering
+        paginator.base_url = by_map_url(request, obj)
+        return {
+            'next': paginator.get_next_link(),
+            'results': MapPinSerializer(page, many=True, context=self.context).data,
+        }
+
+    def get_collaborators(self, obj):
+        """Get the collaborators of the map."""
+        collaborators = obj.collaborators.select_related('user')
+        return MapCollaboratorSerializer(collaborators, many=True, context=self.context).data
 
 
 class MapStyleChoicesSerializer(serializers.Serializer):
@@ -0,0 +1,85 @@
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+
+from geosocial.maps.access import get_map_access
+from geosocial.maps.events import channel_name, get_broker
+from geosocial.maps.models import Map
+
+from .async_views import authenticate
+
+
+async def _viewable_map(user, **lookup):
+    """Return the map matching ``lookup`` if ``user`` may view its pins, else ``None``."""
+    map_instance = await Map.objects.filter(**lookup).afirst()
+    if map_instance is None:
+        return None
+    access = await sync_to_async(get_map_access)(user)
+    return map_instance if access.can_view(map_instance) else None
+
+
+@transaction.non_atomic_requests
+async def pin_event_stream(request, slug):
+    """
+    Stream pin changes of a map as server-sent events.
+
+    Authentication and the view permission are the same as for
+    ``MapPinViewSet``. Each ``data:`` line is a JSON event published by
+    :func:`geosocial.maps.events.publish_pin_event`. A comment is sent after
+    ``MAPS_EVENT_HEARTBEAT_SECONDS`` without events to keep proxies from
+    closing the connection. Access is re-checked every
+    ``MAPS_EVENT_ACCESS_CHECK_SECONDS``, busy or not, and the stream ends once
+    the user can no longer view the map. Clients that reconnect should catch
+    up through the map's ``changes`` endpoint.
+
+    Only ASGI servers can stream: under WSGI, Django reads an async
+    iterator to the end before sending anything, so this endless stream
+    would hold a worker forever and the client would receive nothing.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'detail': 'Pin event streams need the ASGI application (config.asgi).'},
+            status=501
+        )
+    user = await authenticate(request)
+    if user is None or not user.is_authenticated:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=401
+        )
+    map_instance = await _viewable_map(user, slug=slug)
+    if map_instance is None:
+        return JsonResponse({'detail': 'No Map matches the given query.'}, status=404)
+
+    async def events():
+        heartbeat = settings.MAPS_EVENT_HEARTBEAT_SECONDS
+        access_check = settings.MAPS_EVENT_ACCESS_CHECK_SECONDS
+        async with get_broker().subscribe(channel_name(map_instance.pk)) as subscription:
+            yield f'retry: {settings.MAPS_EVENT_RETRY_MS}\n\n'
+            heartbeat_at = time.monotonic() + heartbeat
+            check_at = time.monotonic() + access_check
+            while True:
+                now = time.monotonic()
+                if now >= check_at:
+                    # Access or visibility may have changed since the stream opened
+                    if await _viewable_map(user, pk=map_instance.pk) is None:
+                        return
+                    check_at = now + access_check
+                if now >= heartbeat_at:
+                    yield ': heartbeat\n\n'
+                    heartbeat_at = now + heartbeat
+                # A deadline may already have passed while the last event was sent
+                message = await subscription.get(max(min(heartbeat_at, check_at) - now, 0))
+                if message is not None:
+                    yield f'data: {message}\n\n'
+                    heartbeat_at = time.monotonic() + heartbeat
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
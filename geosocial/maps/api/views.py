@@ -8,24 +8,116 @@ from rest_framework.mixins import (
     DestroyModelMixin
 )
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 from rest_framework.viewsets import GenericViewSet
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser, IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
 
+from geosocial.maps.access import request_map_access
 from geosocial.maps.models import (
     Map, MapPin, MapCollaborator, 
     MapStyleChoices, ContentTypeChoices, IconChoices
 )
+from geosocial.maps.events import pin_payload, publish_pin_event
+from geosocial.maps.geojson import PIN_PROPERTIES, iter_feature_collection
+from geosocial.maps.mvt import encode_tile, tile_bounds, tile_coordinates
+from geosocial.maps.response_cache import cached_response, response_cache_stats
+from geosocial.maps.spatial import (
+    MAX_ZOOM, BoundingBox, cluster_pins, nearest_pins, parse_point
+)
+from geosocial.maps.sync import cursor_expired, decode_cursor, pin_changes
+from .pagination import MapPinCursorPagination
+from .reads import PUBLIC_MAPS_LATEST, PinListing, maps_for_fieldset, public_maps_version
+from .renderers import GeoJSONRenderer, VectorTileRenderer
 from .serializers import (
-    MapSerializer, MapDetailSerializer, MapPinSerializer, 
+    MapSerializer, MapDetailSerializer, MapPinSerializer, MapPinDistanceSerializer,
+    MapPinBulkCreateSerializer, MapPinBulkItemSerializer, MapPinValuesSerializer,
+    SparseFieldsetMixin,
     MapCollaboratorSerializer, MapStyleChoicesSerializer,
     ContentTypeChoicesSerializer, IconChoicesSerializer
 )
 
 
+def parse_fieldset(params):
+    """Parse the ``fields`` and ``omit`` query parameters."""
+    fields = params.get('fields')
+    return {
+        'fields': None if fields is None else {name for name in fields.split(',') if name},
+        'omit': {name for name in params.get('omit', '').split(',') if name},
+    }
+
+
+def fieldset_wants(fieldset, name):
+    """Check whether a serializer field is part of a parsed fieldset."""
+    return (
+        (fieldset['fields'] is None or name in fieldset['fields']) and
+        name not in fieldset['omit']
+    )
+
+
+def not_modified_response(request, map_instance):
+    """Return a 304 when the request's validators match the map version, else ``None``."""
+    return get_conditional_response(
+        request, etag=map_instance.etag,
+        last_modified=int(map_instance.updated_at.timestamp())
+    )
+
+
+def set_map_validators(response, map_instance):
+    """Add the map version's ``ETag`` and ``Last-Modified`` to a 200 or 304 response."""
+    if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        response['ETag'] = map_instance.etag
+        response['Last-Modified'] = http_date(int(map_instance.updated_at.timestamp()))
+        patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def conditional_map_response(request, map_instance, build_response):
+    """
+    Answer a read of a map or its pins with validators from the map version.
+
+    ``If-None-Match``/``If-Modified-Since`` are checked against the map's
+    ``etag`` and ``updated_at`` first, so a 304 is returned without calling
+    ``build_response`` and without loading any pins.
+    """
+    response = not_modified_response(request, map_instance)
+    if response is None:
+        response = build_response()
+    return set_map_validators(response, map_instance)
+
+
+class SparseFieldsetViewMixin:
+    """
+    ViewSet mixin passing ``?fields=a,b`` and ``?omit=c`` to the serializer.
+
+    Only serializers built on ``SparseFieldsetMixin`` receive them, and only
+    for reads: writes always validate against every field.
+    """
+
+    def get_fieldset(self):
+        """Parse the ``fields`` and ``omit`` query parameters of a read."""
+        if self.request.method not in SAFE_METHODS:
+            return parse_fieldset({})
+        return parse_fieldset(self.request.query_params)
+
+    def wants_field(self, name):
+        """Check whether a serializer field is part of the requested fieldset."""
+        return fieldset_wants(self.get_fieldset(), name)
+
+    def get_serializer(self, *args, **kwargs):
+        """Return a serializer limited to the requested fieldset."""
+        if issubclass(self.get_serializer_class(), SparseFieldsetMixin):
+            kwargs = {**self.get_fieldset(), **kwargs}
+        return super().get_serializer(*args, **kwargs)
+
+
 class MapViewSet(
+    SparseFieldsetViewMixin,
     CreateModelMixin,
     RetrieveModelMixin,
     UpdateModelMixin,
@@ -39,14 +131,20 @@ class MapViewSet(
     lookup_field = "slug"
     queryset = Map.objects.all()
 
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Render error payloads of binary endpoints as JSON instead of an empty tile."""
+        if (
+            isinstance(response, Response) and not isinstance(response.data, bytes)
+            and isinstance(getattr(request, 'accepted_renderer', None), VectorTileRenderer)
+        ):
+            request.accepted_renderer = JSONRenderer()
+            request.accepted_media_type = JSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
+
     def get_queryset(self):
         """Get maps that user owns, collaborates on, or are public."""
-        user = self.request.user
-        return Map.objects.filter(
-            Q(owner=user) |
-            Q(collaborators__user=user) |
-            Q(public_view=True)
-        ).distinct()
+        access = request_map_access(self.request)
+        return maps_for_fieldset(Map.objects.filter(access.visible_maps_q()), self.wants_field('owner'))
 
     def get_serializer_class(self):
         """Return appropriate serializer class."""
@@ -54,6 +152,14 @@ class MapViewSet(
             return MapDetailSerializer
         return MapSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        """Get a map, answering conditional requests from its version."""
+        map_instance = self.get_object()
+        return conditional_map_response(
+            request, map_instance,
+            lambda: Response(self.get_serializer(map_instance).data)
+        )
+
     def perform_create(self, serializer):
         """Set the owner to the current user when creating a map."""
         serializer.save(owner=self.request.user)
@@ -70,10 +176,177 @@ class MapViewSet(
             raise PermissionDenied("You can only delete your own maps.")
         instance.delete()
 
+    @action(detail=True, methods=['get'])
+    def clusters(self, request, slug=None):
+        """
+        Get pins aggregated into grid clusters for a zoom level.
+
+        At most ``MAPS_BBOX_PIN_LIMIT`` clusters are returned; ``truncated``
+        tells when more were dropped, e.g. for a high zoom without ``bbox``.
+        """
+        map_instance = self.get_object()
+
+        try:
+            zoom = int(request.query_params.get('z', ''))
+        except ValueError:
+            zoom = -1
+        if not 0 <= zoom <= MAX_ZOOM:
+            return Response(
+                {'error': f'z parameter must be an integer between 0 and {MAX_ZOOM}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        pins = map_instance.pins.all()
+        bbox_param = request.query_params.get('bbox')
+        if bbox_param is not None:
+            try:
+                bbox = BoundingBox.from_string(bbox_param)
+            except ValueError as exc:
+                return Response(
+                    {'error': str(exc)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            pins = pins.filter(bbox.to_q())
+
+        limit = settings.MAPS_BBOX_PIN_LIMIT
+        clusters = cluster_pins(
+            pins, zoom, cells_per_tile=settings.MAPS_CLUSTER_CELLS_PER_TILE, limit=limit
+        )
+        return Response({
+            'zoom': zoom,
+            'truncated': len(clusters) > limit,
+            'clusters': clusters[:limit],
+        })
+
+    @action(
+        detail=True,
+        methods=['get'],
+        url_path=r'tiles/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.mvt',
+        renderer_classes=[VectorTileRenderer, JSONRenderer],
+    )
+    def tiles(self, request, slug=None, z=None, x=None, y=None):
+        """
+        Get the pins of a map as a Mapbox Vector Tile.
+
+        Tiles carry the map version's validators, so clients revalidate
+        them with a conditional request once ``MAPS_TILE_MAX_AGE`` has
+        passed. A tile holds at most ``MAPS_BBOX_PIN_LIMIT`` pins; as the
+        format has no room for a flag, ``X-Truncated: true`` tells clients
+        that more pins were dropped.
+        """
+        map_instance = self.get_object()
+        z, x, y = int(z), int(x), int(y)
+        if z > MAX_ZOOM or x >= 2 ** z or y >= 2 ** z:
+            return Response(
+                {'error': 'Tile coordinates are out of range'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        def build_tile():
+            bbox = tile_bounds(z, x, y)
+            limit = settings.MAPS_BBOX_PIN_LIMIT
+            pins = list(
+                map_instance.pins
+                .filter(bbox.to_q())
+                .values_list('id', 'name', 'icon', 'content_type', 'latitude', 'longitude')
+                [:limit + 1]
+            )
+            features = [
+                (
+                    *tile_coordinates(latitude, longitude, z, x, y),
+                    {'id': pin_id, 'name': name, 'icon': icon, 'content_type': content_type},
+                )
+                for pin_id, name, icon, content_type, latitude, longitude in pins[:limit]
+            ]
+            response = Response(encode_tile({'pins': features}))
+            if len(pins) > limit:
+                response['X-Truncated'] = 'true'
+            return response
+
+        response = conditional_map_response(request, map_instance, build_tile)
+        visibility = 'public' if map_instance.public_view else 'private'
+        patch_cache_control(
+            response, max_age=settings.MAPS_TILE_MAX_AGE, **{visibility: True}
+        )
+        return response
+
+    @action(
+        detail=True,
+        methods=['get'],
+        url_path=r'export\.geojson',
+        renderer_classes=[GeoJSONRenderer, JSONRenderer],
+    )
+    def export(self, request, slug=None):
+        """
+        Stream every pin of a map as a GeoJSON FeatureCollection.
+
+        Rows are read through a server-side cursor as plain values and
+        encoded as they arrive, so memory use does not grow with the map.
+        """
+        map_instance = self.get_object()
+
+        def stream():
+            rows = (
+                map_instance.pins
+                .order_by()
+                .values(*PIN_PROPERTIES, 'latitude', 'longitude')
+                .iterator(chunk_size=settings.MAPS_EXPORT_CHUNK_SIZE)
+            )
+            response = StreamingHttpResponse(
+                iter_feature_collection(rows),
+                content_type=GeoJSONRenderer.media_type
+            )
+            response['Content-Disposition'] = (
+                f'attachment; filename="{map_instance.slug}.geojson"'
+            )
+            return response
+
+        return conditional_map_response(request, map_instance, stream)
+
+    @action(detail=True, methods=['get'])
+    def changes(self, request, slug=None):
+        """
+        Get the pins of a map changed and deleted since a sync cursor.
+
+        Without ``since`` every pin is returned. The response carries the
+        ``cursor`` to pass as ``since`` next time; while ``complete`` is
+        false, more changes are waiting and the client should ask again
+        straight away. A cursor older than the tombstone retention gets a
+        410 and the client must sync from scratch.
+        """
+        map_instance = self.get_object()
+
+        cursor = None
+        since = request.query_params.get('since')
+        if since:
+            try:
+                cursor = decode_cursor(since)
+            except ValueError as exc:
+                return Response(
+                    {'error': str(exc)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if cursor_expired(cursor[0]):
+                return Response(
+                    {'error': 'since is too old; sync again without it.'},
+                    status=status.HTTP_410_GONE
+                )
+
+        pin_values = MapPinValuesSerializer(**self.get_fieldset())
+        updated, deleted, next_cursor, complete = pin_changes(
+            map_instance, cursor, settings.MAPS_SYNC_PAGE_SIZE, pin_values
+        )
+        return Response({
+            'cursor': next_cursor,
+            'complete': complete,
+            'updated': pin_values.to_representation(updated),
+            'deleted': [str(pin_id) for pin_id in deleted],
+        })
+
     @action(detail=False, methods=['get'])
     def my_maps(self, request):
         """Get maps owned by current user."""
-        maps = Map.objects.filter(owner=request.user)
+        maps = Map.objects.filter(owner=request.user).select_related('owner')
         serializer = self.get_serializer(maps, many=True)
         return Response(serializer.data)
 
@@ -81,11 +354,22 @@ class MapViewSet(
     def public_maps(self, request):
         """Get public maps."""
         maps = Map.objects.filter(public_view=True)
-        serializer = self.get_serializer(maps, many=True)
-        return Response(serializer.data)
+        version = public_maps_version(maps.aggregate(**PUBLIC_MAPS_LATEST))
+
+        def build_response():
+            serializer = self.get_serializer(maps_for_fieldset(maps, self.wants_field('owner')), many=True)
+            return self.finalize_response(request, Response(serializer.data)).render()
+
+        return cached_response(request, 'public_maps', version, build_response)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        """Get hit and miss counters of the public response cache."""
+        return Response(response_cache_stats())
 
 
 class MapPinViewSet(
+    SparseFieldsetViewMixin,
     CreateModelMixin,
     RetrieveModelMixin,
     UpdateModelMixin,
@@ -96,34 +380,87 @@ class MapPinViewSet(
     """ViewSet for MapPin model."""
     serializer_class = MapPinSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = MapPinCursorPagination
     queryset = MapPin.objects.all()
 
     def get_queryset(self):
         """Get pins from maps user can access."""
-        user = self.request.user
-        accessible_maps = Map.objects.filter(
-            Q(owner=user) |
-            Q(collaborators__user=user) |
-            Q(public_view=True)
+        access = request_map_access(self.request)
+        queryset = MapPin.objects.filter(access.visible_maps_q(prefix='map__'))
+        if self.request.method != 'GET':
+            return queryset
+
+        # Load only what the requested fieldset renders
+        columns = {'id', 'map', 'placed_by', 'timestamp'}
+        columns.update(
+            field.name for field in MapPin._meta.concrete_fields
+            if self.wants_field(field.name)
         )
-        return MapPin.objects.filter(map__in=accessible_maps)
+        if self.wants_field('map_name'):
+            queryset = queryset.select_related('map')
+            columns.add('map__name')
+        if self.wants_field('placed_by'):
+            queryset = queryset.select_related('placed_by')
+            columns.add('placed_by__username')
+        return queryset.only(*columns)
+
+    def get_serializer_class(self):
+        """Return appropriate serializer class."""
+        if self.action == 'nearest' or (
+            self.action in ('list', 'by_map') and 'near' in self.request.query_params
+        ):
+            return MapPinDistanceSerializer
+        if self.action == 'bulk_create':
+            return MapPinBulkCreateSerializer
+        return MapPinSerializer
+
+    def get_viewable_map(self, map_slug):
+        """Get a map by slug, checking that the current user can view it."""
+        map_instance = get_object_or_404(Map, slug=map_slug)
+        if not request_map_access(self.request).can_view(map_instance):
+            raise PermissionDenied("You don't have permission to view this map.")
+        return map_instance
+
+    def list(self, request, *args, **kwargs):
+        """List pins from accessible maps, optionally limited to a bbox or radius."""
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.pins_response(request, queryset)
+
+    def pins_response(self, request, queryset):
+        """
+        Serialize a pin listing, as described by ``PinListing``.
+
+        Plain listings are cursor paginated on ``(timestamp, id)``. Except for
+        radius results, pins are rendered from value rows by
+        ``MapPinValuesSerializer`` rather than model instances.
+        """
+        try:
+            listing = PinListing(queryset, request.query_params, self.get_fieldset())
+        except ValueError as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if listing.paginated:
+            page = self.paginate_queryset(listing.page_rows())
+            return self.get_paginated_response(listing.pin_values.to_representation(page))
+        if listing.near is None:
+            rows = list(listing.capped_rows())
+        else:
+            matches = listing.matches(listing.candidates())
+            rows = listing.with_distances(matches, listing.matched_pins(matches))
+        return Response(listing.capped_data(rows))
+
+    def check_can_contribute(self, map_instance):
+        """Raise ``PermissionDenied`` unless the current user can add pins to a map."""
+        if not request_map_access(self.request).can_contribute(map_instance):
+            raise PermissionDenied("You don't have permission to add pins to this map.")
 
     def perform_create(self, serializer):
         """Set the placed_by to current user and validate map access."""
-        map_instance = serializer.validated_data['map']
-        user = self.request.user
-        
-        # Check if user can contribute to this map
-        can_contribute = (
-            map_instance.owner == user or
-            map_instance.collaborators.filter(user=user).exists() or
-            map_instance.public_contribution
-        )
-        
-        if not can_contribute:
-            raise PermissionDenied("You don't have permission to add pins to this map.")
-        
-        serializer.save(placed_by=user)
+        self.check_can_contribute(serializer.validated_data['map'])
+        serializer.save(placed_by=self.request.user)
 
     def perform_update(self, serializer):
         """Only allow pin creator or map owner to update."""
@@ -131,8 +468,8 @@ class MapPinViewSet(
         user = self.request.user
         
         can_edit = (
-            instance.placed_by == user or
-            instance.map.owner == user
+            instance.placed_by_id == user.pk or
+            instance.map_id in request_map_access(self.request).owned
         )
         
         if not can_edit:
@@ -145,8 +482,8 @@ class MapPinViewSet(
         user = self.request.user
         
         can_delete = (
-            instance.placed_by == user or
-            instance.map.owner == user
+            instance.placed_by_id == user.pk or
+            instance.map_id in request_map_access(self.request).owned
         )
         
         if not can_delete:
@@ -156,7 +493,7 @@ class MapPinViewSet(
 
     @action(detail=False, methods=['get'])
     def by_map(self, request):
-        """Get pins for a specific map."""
+        """Get pins for a specific map, optionally limited to a bbox or radius."""
         map_slug = request.query_params.get('map_slug')
         if not map_slug:
             return Response(
@@ -164,20 +501,97 @@ class MapPinViewSet(
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        map_instance = get_object_or_404(Map, slug=map_slug)
-        
-        # Check if user can view this map
-        user = request.user
-        can_view = (
-            map_instance.owner == user or
-            map_instance.collaborators.filter(user=user).exists() or
-            map_instance.public_view
+        map_instance = self.get_viewable_map(map_slug)
+        pins = self.filter_queryset(self.get_queryset()).filter(map=map_instance)
+
+        def build_response():
+            if not map_instance.public_view:
+                return self.pins_response(request, pins)
+            # Public pin listings are the same for every viewer
+            return cached_response(
+                request, f'pins:{map_instance.pk}', map_instance.version,
+                lambda: self.finalize_response(request, self.pins_response(request, pins)).render()
+            )
+
+        return conditional_map_response(request, map_instance, build_response)
+
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """
+        Create many pins on one map in a single request.
+
+        Expects ``{"map": <map id>, "pins": [...]}``. Permission is checked
+        once for the map, every pin is validated, and the valid ones are
+        inserted with ``bulk_create``. Invalid pins are skipped and reported
+        by their index in ``errors``.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        map_instance = serializer.validated_data['map']
+        self.check_can_contribute(map_instance)
+
+        pins = []
+        errors = []
+        context = self.get_serializer_context()
+        for index, item in enumerate(serializer.validated_data['pins']):
+            item_serializer = MapPinBulkItemSerializer(data=item, context=context)
+            if not item_serializer.is_valid():
+                errors.append({'index': index, 'errors': item_serializer.errors})
+                continue
+            pin = MapPin(
+                **item_serializer.validated_data,
+                map=map_instance,
+                placed_by=request.user
+            )
+            pin.update_geohash()
+            pins.append(pin)
+
+        MapPin.objects.bulk_create(pins, batch_size=settings.MAPS_BULK_CREATE_BATCH_SIZE)
+        Map.record_change(map_instance.pk, pins=len(pins))
+        if pins:
+            publish_pin_event(map_instance.pk, 'created', [pin_payload(pin) for pin in pins])
+        return Response(
+            {'created': [pin.id for pin in pins], 'errors': errors},
+            status=status.HTTP_201_CREATED if pins else status.HTTP_400_BAD_REQUEST
         )
-        
-        if not can_view:
-            raise PermissionDenied("You don't have permission to view this map.")
-        
-        pins = self.get_queryset().filter(map=map_instance)
+
+    @action(detail=False, methods=['get'])
+    def nearest(self, request):
+        """
+        Get the ``k`` pins closest to ``lat``/``lon``, nearest first.
+
+        Searches all accessible maps, or only ``map_slug`` when given. Each
+        pin carries its great-circle ``distance`` in metres.
+        """
+        params = request.query_params
+        max_k = settings.MAPS_NEAREST_MAX_K
+        try:
+            lat, lon = parse_point(params.get('lat'), params.get('lon'))
+        except ValueError as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            k = int(params.get('k', 10))
+        except ValueError:
+            k = 0
+        if not 1 <= k <= max_k:
+            return Response(
+                {'error': f'k parameter must be an integer between 1 and {max_k}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        pins = self.filter_queryset(self.get_queryset())
+        map_slug = params.get('map_slug')
+        if map_slug:
+            pins = pins.filter(map=self.get_viewable_map(map_slug))
+
+        nearest = nearest_pins(
+            pins, lat, lon, k,
+            initial_radius_m=settings.MAPS_NEAREST_INITIAL_RADIUS_M
+        )
+        pins = PinListing.with_distances(nearest, PinListing.matched_pins(nearest))
         serializer = self.get_serializer(pins, many=True)
         return Response(serializer.data)
 
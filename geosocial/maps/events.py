@@ -0,0 +1,153 @@
+"""
+Real-time pin change events.
+
+Pin writes publish a compact event on their map's channel once the
+transaction commits, and :func:`geosocial.maps.api.streams.pin_event_stream`
+relays them to subscribed clients as server-sent events. With
+``MAPS_EVENTS_REDIS_URL`` set, events travel over Redis pub/sub so every
+worker sees every write; otherwise an in-process broker is used, which only
+reaches clients of the same process and is meant for development and tests.
+"""
+import asyncio
+import contextlib
+import json
+import threading
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.db import transaction
+
+
+def channel_name(map_id):
+    """Name of the channel carrying a map's pin events."""
+    return f'maps:events:{map_id}'
+
+
+def pin_payload(pin):
+    """Compact representation of a pin in a created or updated event."""
+    return {
+        'id': str(pin.pk),
+        'name': pin.name,
+        'latitude': float(pin.latitude),
+        'longitude': float(pin.longitude),
+        'icon': pin.icon,
+        'content_type': pin.content_type,
+        'updated_at': pin.updated_at.isoformat(),
+    }
+
+
+def publish_pin_event(map_id, action, pins):
+    """
+    Publish an event for pins of a map once the current transaction commits.
+
+    ``action`` is ``created``, ``updated`` or ``deleted``; ``pins`` are
+    ``pin_payload`` dicts, or ``{"id": ...}`` dicts for deletions.
+    """
+    channel = channel_name(map_id)
+    message = json.dumps({'action': action, 'pins': pins})
+    # A broker outage must not fail a write that has already committed
+    transaction.on_commit(lambda: get_broker().publish(channel, message), robust=True)
+
+
+class LocalSubscription:
+    """Messages published on one channel of a ``LocalBroker``."""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    def deliver(self, message):
+        """Queue a message from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, message)
+        except RuntimeError:
+            # The subscriber's event loop has already been closed
+            pass
+
+    async def get(self, timeout):
+        """Wait for the next message, or return ``None`` after ``timeout`` seconds."""
+        if timeout <= 0:
+            # wait_for() cancels the read before it runs when no time is left
+            try:
+                return self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return None
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class LocalBroker:
+    """In-process broker delivering events to subscribers of the same process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, channel):
+        subscription = LocalSubscription()
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscriptions = self._subscriptions[channel]
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[channel]
+
+
+class RedisSubscription:
+    """Messages published on one Redis pub/sub channel."""
+
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        """Wait for the next message, or return ``None`` after ``timeout`` seconds."""
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return None if message is None else message['data'].decode()
+
+
+class RedisBroker:
+    """Broker over Redis pub/sub, shared by every worker."""
+
+    def __init__(self, url):
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, channel, message):
+        self._client.publish(channel, message)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, channel):
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            yield RedisSubscription(pubsub)
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+
+_broker = None
+
+
+def get_broker():
+    """Return the process-wide event broker."""
+    global _broker
+    if _broker is None:
+        url = settings.MAPS_EVENTS_REDIS_URL
+        _broker = RedisBroker(url) if url else LocalBroker()
+    return _broker
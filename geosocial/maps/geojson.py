@@ -0,0 +1,52 @@
+"""
+Streaming GeoJSON encoding of map pins.
+
+Pins are written as a `RFC 7946 <https://datatracker.ietf.org/doc/html/rfc7946>`_
+``FeatureCollection`` of ``Point`` features, one chunk of text at a time, so
+a map of any size can be exported without building the whole document.
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+
+# ``MapPin.values()`` fields copied into each feature's ``properties``
+PIN_PROPERTIES = (
+    'id', 'name', 'description', 'placed_by__username', 'timestamp',
+    'content_url', 'content_type', 'icon',
+)
+
+_encoder = DjangoJSONEncoder(separators=(',', ':'))
+
+
+def pin_feature(row):
+    """Build a GeoJSON ``Feature`` from a ``MapPin.values()`` row."""
+    properties = {field: row[field] for field in PIN_PROPERTIES}
+    properties['placed_by'] = properties.pop('placed_by__username')
+    return {
+        'type': 'Feature',
+        'id': row['id'],
+        'geometry': {
+            'type': 'Point',
+            'coordinates': [float(row['longitude']), float(row['latitude'])],
+        },
+        'properties': properties,
+    }
+
+
+def iter_feature_collection(rows, batch_size=500):
+    """
+    Yield a ``FeatureCollection`` of pin rows as text chunks.
+
+    Features are encoded ``batch_size`` at a time so the response is sent in
+    reasonably sized writes rather than one per pin.
+    """
+    yield '{"type":"FeatureCollection","features":['
+    batch = []
+    separator = ''
+    for row in rows:
+        batch.append(_encoder.encode(pin_feature(row)))
+        if len(batch) >= batch_size:
+            yield separator + ','.join(batch)
+            separator = ','
+            batch = []
+    if batch:
+        yield separator + ','.join(batch)
+    yield ']}'
@@ -0,0 +1,193 @@
+"""
+Readers and validation for bulk pin imports.
+
+Input is read incrementally, so files far larger than memory can be
+imported: CSV row by row, and GeoJSON one feature at a time out of the
+``FeatureCollection``'s ``features`` array.
+"""
+import csv
+import json
+import re
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.db import connection
+from django.utils import timezone
+
+from geosocial.maps.models import ContentTypeChoices, IconChoices, MapPin
+
+# Columns read from CSV headers or GeoJSON feature properties
+PIN_COLUMNS = ('name', 'description', 'latitude', 'longitude', 'content_url', 'content_type', 'icon')
+
+_FEATURES_ARRAY = re.compile(r'"features"\s*:\s*\[')
+_COORDINATE = Decimal('0.000001')
+
+
+def read_csv(stream):
+    """Yield pin dicts from CSV with a header row naming ``PIN_COLUMNS``."""
+    for row in csv.DictReader(stream):
+        yield {column: row.get(column) for column in PIN_COLUMNS}
+
+
+def read_geojson(stream, buffer_size=1 << 16):
+    """
+    Yield pin dicts from the ``Point`` features of a GeoJSON FeatureCollection.
+
+    Features are decoded one at a time from a sliding text buffer, so only
+    the feature being parsed is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    match = None
+    while match is None:
+        chunk = stream.read(buffer_size)
+        if not chunk:
+            raise ValueError("Input is not a GeoJSON FeatureCollection.")
+        buffer += chunk
+        match = _FEATURES_ARRAY.search(buffer)
+
+    position = match.end()
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            feature, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = stream.read(buffer_size)
+            if not chunk:
+                raise ValueError("GeoJSON input ends inside the features array.") from None
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        if position > buffer_size:
+            buffer = buffer[position:]
+            position = 0
+        yield _feature_to_pin(feature)
+
+
+def _feature_to_pin(feature):
+    """Flatten a GeoJSON ``Feature`` into a pin dict."""
+    if not isinstance(feature, dict):
+        return {}
+    properties = feature.get('properties') or {}
+    geometry = feature.get('geometry') or {}
+    pin = {column: properties.get(column) for column in PIN_COLUMNS}
+    coordinates = geometry.get('coordinates')
+    if geometry.get('type') == 'Point' and isinstance(coordinates, list) and len(coordinates) >= 2:
+        pin['longitude'], pin['latitude'] = coordinates[0], coordinates[1]
+    else:
+        pin['longitude'] = pin['latitude'] = None
+    return pin
+
+
+def chunked(iterable, size):
+    """Yield lists of up to ``size`` items."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _coordinate(value, limit, label):
+    """Parse a coordinate at the precision stored on ``MapPin``."""
+    try:
+        coordinate = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"{label} must be a number.") from None
+    if value is None or not coordinate.is_finite():
+        raise ValueError(f"{label} must be a number.")
+    # Checked before quantizing, which fails on huge values
+    if not -limit <= coordinate <= limit:
+        raise ValueError(f"{label} must be between -{limit} and {limit}.")
+    return coordinate.quantize(_COORDINATE)
+
+
+def _text(row, column, default=''):
+    """Read a text column, which GeoJSON properties may hold as any JSON type."""
+    value = row.get(column)
+    if value is None or value == '':
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f"{column} must be a string.")
+    return value
+
+
+def validate_pins(rows, map_instance, placed_by):
+    """
+    Validate a chunk of pin dicts against the ``MapPin`` constraints.
+
+    Returns the unsaved pins, with their geohash computed, and a list of
+    ``(index, message)`` pairs for the rows that were rejected.
+    """
+    content_types = set(ContentTypeChoices.values)
+    icons = set(IconChoices.values)
+    validate_url = URLValidator()
+    pins = []
+    errors = []
+    for index, row in enumerate(rows):
+        try:
+            name = _text(row, 'name').strip()
+            if not name or len(name) > 255:
+                raise ValueError("name is required and must be at most 255 characters.")
+            description = _text(row, 'description')
+            latitude = _coordinate(row.get('latitude'), 90, 'latitude')
+            longitude = _coordinate(row.get('longitude'), 180, 'longitude')
+            content_url = _text(row, 'content_url').strip()
+            if len(content_url) > 500:
+                raise ValueError("content_url must be at most 500 characters.")
+            try:
+                validate_url(content_url)
+            except ValidationError:
+                raise ValueError("content_url must be a valid URL.") from None
+            content_type = _text(row, 'content_type', ContentTypeChoices.IMAGE)
+            if content_type not in content_types:
+                raise ValueError(f"content_type {content_type!r} is not a valid choice.")
+            icon = _text(row, 'icon', IconChoices.POINT)
+            if icon not in icons:
+                raise ValueError(f"icon {icon!r} is not a valid choice.")
+        except ValueError as exc:
+            errors.append((index, str(exc)))
+            continue
+
+        pin = MapPin(
+            map=map_instance,
+            placed_by=placed_by,
+            name=name,
+            description=description,
+            latitude=latitude,
+            longitude=longitude,
+            content_url=content_url,
+            content_type=content_type,
+            icon=icon,
+        )
+        pin.update_geohash()
+        pins.append(pin)
+    return pins, errors
+
+
+def write_pins(pins):
+    """
+    Insert pins as fast as the database allows, ``COPY`` on PostgreSQL.
+
+    Other databases fall back to ``bulk_create``, which always stamps the
+    creation times with now. No signals are sent: callers keep map counters
+    and versions up to date.
+    """
+    if connection.vendor != 'postgresql':
+        MapPin.objects.bulk_create(pins)
+        return
+
+    now = timezone.now()
+    fields = MapPin._meta.concrete_fields
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    table = connection.ops.quote_name(MapPin._meta.db_table)
+    with connection.cursor() as cursor, cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+        for pin in pins:
+            # auto_now/auto_now_add are only applied by save() and bulk_create()
+            for attname in ('timestamp', 'created_at', 'updated_at'):
+                if getattr(pin, attname) is None:
+                    setattr(pin, attname, now)
+            copy.write_row([getattr(pin, field.attname) for field in fields])
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from geosocial.maps.models import MapPin
+
+
+class Command(BaseCommand):
+    help = "Compute the geohash spatial key of map pins in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Number of pins updated per statement.',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute every pin instead of only pins without a geohash.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = MapPin.objects.only('id', 'latitude', 'longitude', 'geohash').order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(geohash='')
+
+        updated = 0
+        last_pk = None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            pins = list(batch[:batch_size])
+            if not pins:
+                break
+            for pin in pins:
+                pin.update_geohash()
+            MapPin.objects.bulk_update(pins, ['geohash'])
+            last_pk = pins[-1].pk
+            updated += len(pins)
+            self.stdout.write(f"Updated {updated} pins...")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled geohash for {updated} pins."))
@@ -0,0 +1,247 @@
+import itertools
+import json
+import statistics
+import time
+import tracemalloc
+from decimal import Decimal
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from geosocial.maps.api.serializers import MapDetailSerializer
+from geosocial.maps.api.views import MapPinViewSet, MapViewSet
+from geosocial.maps.imports import write_pins
+from geosocial.maps.models import Map, MapCollaborator, MapPin
+from geosocial.maps.signals import create_user_default_map
+
+# The response and access caches are bypassed, so every run does the full work
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the API hot paths at several dataset sizes and record wall time, "
+        "query count and peak memory as JSON, optionally compared against a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='100,1000,10000',
+            help='Comma-separated pin counts of the benchmarked map; a tenth as many maps are created.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of timed runs per benchmark; the fastest and the median are reported.',
+        )
+        parser.add_argument('--output', help='File to write the JSON results to.')
+        parser.add_argument('--compare', help='JSON results of an earlier run to compare against.')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Allowed relative slowdown or memory growth before a benchmark counts as a regression.',
+        )
+        parser.add_argument('--label', default='', help='Label stored with the results, e.g. a commit hash.')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError as exc:
+            raise CommandError("--sizes must be comma-separated integers.") from exc
+        baseline = self.load_baseline(options['compare']) if options['compare'] else None
+
+        results = []
+        with override_settings(CACHES=NO_CACHE):
+            for size in sizes:
+                # Each dataset is built and measured in a transaction that is rolled back
+                with transaction.atomic():
+                    benchmarks = self.build_benchmarks(size)
+                    for name, run, setup in benchmarks:
+                        result = {'name': name, 'size': size, **self.measure(run, setup, options['repeat'])}
+                        results.append(result)
+                        self.stdout.write(
+                            f"{name} [{size}]: {result['min_ms']:.2f} ms min, {result['median_ms']:.2f} ms median, "
+                            f"{result['queries']} queries, {result['peak_kib']:.0f} KiB peak"
+                        )
+                    transaction.set_rollback(True)
+
+        report = {
+            'label': options['label'],
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2), encoding='utf-8')
+            self.stdout.write(f"Wrote results to {options['output']}.")
+        if baseline is not None:
+            self.compare(results, baseline, options['tolerance'])
+
+    def build_benchmarks(self, size):
+        """Create a dataset of ``size`` pins; return ``(name, run, setup)`` benchmarks against it."""
+        User = get_user_model()
+        owner = User.objects.create_user(username=f'benchmark-owner-{size}')
+        collaborator = User.objects.create_user(username=f'benchmark-collaborator-{size}')
+        map_instance = Map.objects.create(
+            name='Benchmark', slug=f'benchmark-{size}', description='Benchmark map.',
+            owner=owner, public_view=True,
+        )
+        extra = max(size // 10, 1)
+        maps = Map.objects.bulk_create([
+            Map(
+                name=f'Benchmark {index}', slug=f'benchmark-{size}-{index}', description='Benchmark map.',
+                owner=owner if index % 2 else collaborator, public_view=index % 3 == 0,
+            )
+            for index in range(extra)
+        ])
+        MapCollaborator.objects.bulk_create(
+            [MapCollaborator(map=map_instance, user=collaborator)]
+            + [MapCollaborator(map=other, user=owner) for other in maps if other.owner_id != owner.pk]
+        )
+        now = timezone.now()
+        pins = []
+        for index in range(size):
+            pin = MapPin(
+                map=map_instance,
+                placed_by=owner if index % 2 else collaborator,
+                name=f'Pin {index}',
+                latitude=Decimal('51.500000') + index % 1000 / Decimal(1000),
+                longitude=Decimal('-0.120000') + index // 1000 / Decimal(1000),
+                content_url=f'https://example.com/{index}.jpg',
+                timestamp=now,
+            )
+            pin.update_geohash()
+            pins.append(pin)
+        write_pins(pins)
+        Map.record_change(map_instance.pk, pins=size, collaborators=1)
+        map_instance.refresh_from_db()
+
+        factory = APIRequestFactory()
+
+        def view(viewset, action, path, params=None):
+            view_function = viewset.as_view({'get': action})
+
+            def run():
+                request = factory.get(path, params)
+                force_authenticate(request, user=owner)
+                return view_function(request).render()
+            return run
+
+        def page_walk(viewset, action, path, params):
+            view_function = viewset.as_view({'get': action})
+
+            def run():
+                # Follow the next links like a client loading every pin of the map
+                query = params
+                while query is not None:
+                    request = factory.get(path, query)
+                    force_authenticate(request, user=owner)
+                    response = view_function(request).render()
+                    next_link = response.data['next']
+                    query = dict(parse_qsl(urlsplit(next_link).query)) if next_link else None
+            return run
+
+        def detail():
+            request = Request(factory.get(f'/api/maps/{map_instance.slug}/'))
+            request.user = owner
+            return MapDetailSerializer(map_instance, context={'request': request}).data
+
+        users = itertools.count()
+
+        def new_user():
+            # Saved without post_save, so only the receiver is timed
+            return User.objects.bulk_create([User(username=f'benchmark-signup-{size}-{next(users)}')])[0]
+
+        return [
+            (
+                'by_map_pages',
+                page_walk(MapPinViewSet, 'by_map', '/api/pins/by_map/', {'map_slug': map_instance.slug}),
+                None,
+            ),
+            ('list', view(MapViewSet, 'list', '/api/maps/'), None),
+            ('my_maps', view(MapViewSet, 'my_maps', '/api/maps/my_maps/'), None),
+            ('public_maps', view(MapViewSet, 'public_maps', '/api/maps/public_maps/'), None),
+            ('MapDetailSerializer', detail, None),
+            (
+                'create_user_default_map',
+                lambda user: create_user_default_map(sender=User, instance=user, created=True),
+                new_user,
+            ),
+        ]
+
+    def measure(self, run, setup, repeat):
+        """
+        Time ``repeat`` runs, then count queries and peak memory in one more.
+
+        Query capture and ``tracemalloc`` slow code down, so they are kept out
+        of the timed runs. ``setup``, if given, builds the argument of each run
+        outside the measurement.
+        """
+        if setup is None:
+            setup, call = (lambda: None), (lambda _: run())
+        else:
+            call = run
+
+        call(setup())  # Warm up imports, URL resolvers and connections
+        timings = []
+        for _ in range(repeat):
+            argument = setup()
+            started = time.perf_counter()
+            call(argument)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        argument = setup()
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                call(argument)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            'min_ms': min(timings, default=0.0),
+            'median_ms': statistics.median(timings) if timings else 0.0,
+            'queries': len(queries),
+            'peak_kib': peak / 1024,
+        }
+
+    def load_baseline(self, path):
+        try:
+            return json.loads(Path(path).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read baseline {path!r}: {exc}") from exc
+
+    def compare(self, results, baseline, tolerance):
+        """Report changes against ``baseline`` and fail on regressions."""
+        previous = {(result['name'], result['size']): result for result in baseline.get('results', [])}
+        regressions = []
+        for result in results:
+            before = previous.get((result['name'], result['size']))
+            if before is None:
+                continue
+            label = f"{result['name']} [{result['size']}]"
+            change = result['min_ms'] / before['min_ms'] - 1 if before['min_ms'] else 0.0
+            self.stdout.write(
+                f"{label}: {change:+.0%} time, {result['queries'] - before['queries']:+d} queries, "
+                f"{result['peak_kib'] - before['peak_kib']:+.0f} KiB peak"
+            )
+            if change > tolerance:
+                regressions.append(f"{label} is {change:.0%} slower")
+            if result['queries'] > before['queries']:
+                regressions.append(f"{label} runs {result['queries']} queries instead of {before['queries']}")
+            if before['peak_kib'] and result['peak_kib'] > before['peak_kib'] * (1 + tolerance):
+                regressions.append(f"{label} peaks at {result['peak_kib']:.0f} KiB instead of {before['peak_kib']:.0f}")
+        if regressions:
+            raise CommandError("Regressions against the baseline:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
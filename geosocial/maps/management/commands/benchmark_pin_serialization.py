@@ -0,0 +1,95 @@
+import time
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from geosocial.maps.api.serializers import MapPinSerializer, MapPinValuesSerializer
+from geosocial.maps.models import Map, MapPin
+
+
+class Command(BaseCommand):
+    help = "Compare the per-pin cost of MapPinSerializer and MapPinValuesSerializer."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pins',
+            type=int,
+            default=10000,
+            help='Number of in-memory pins serialized per run.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of runs; the fastest one is reported.',
+        )
+        parser.add_argument(
+            '--fields',
+            help='Comma-separated sparse fieldset, as with ?fields=.',
+        )
+
+    def handle(self, *args, **options):
+        fields = options['fields'].split(',') if options['fields'] else None
+        pins, rows = self.build_pins(options['pins'])
+
+        def serializer_path():
+            return MapPinSerializer(pins, many=True, fields=fields).data
+
+        def values_path():
+            return MapPinValuesSerializer(fields=fields).to_representation(rows)
+
+        results = {}
+        for label, run in [('MapPinSerializer', serializer_path), ('MapPinValuesSerializer', values_path)]:
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+            results[label] = min(timings) / len(pins) * 1e6
+            self.stdout.write(f"{label}: {results[label]:.2f} µs per pin")
+
+        speedup = results['MapPinSerializer'] / results['MapPinValuesSerializer']
+        self.stdout.write(self.style.SUCCESS(f"Values path is {speedup:.1f}x faster per pin."))
+
+    def build_pins(self, count):
+        """Build unsaved pins and the equivalent ``values()`` rows; no database is needed."""
+        User = get_user_model()
+        user = User(username='benchmark')
+        map_instance = Map(id=uuid.uuid4(), name='Benchmark', slug='benchmark', owner=user)
+        now = timezone.now()
+        pins = []
+        rows = []
+        for index in range(count):
+            pin = MapPin(
+                map=map_instance,
+                placed_by=user,
+                name=f'Pin {index}',
+                description='A pin used to benchmark serialization.',
+                latitude=Decimal('51.500000') + index % 1000 / Decimal(1000),
+                longitude=Decimal('-0.120000'),
+                timestamp=now,
+                content_url=f'https://example.com/{index}.jpg',
+                created_at=now,
+                updated_at=now,
+            )
+            pins.append(pin)
+            rows.append({
+                'id': pin.id,
+                'map': map_instance.id,
+                'map__name': map_instance.name,
+                'placed_by__username': user.username,
+                'name': pin.name,
+                'description': pin.description,
+                'latitude': pin.latitude,
+                'longitude': pin.longitude,
+                'timestamp': pin.timestamp,
+                'content_url': pin.content_url,
+                'content_type': pin.content_type,
+                'icon': pin.icon,
+                'created_at': pin.created_at,
+                'updated_at': pin.updated_at,
+            })
+        return pins, rows
@@ -0,0 +1,100 @@
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Read endpoints, relative to the API root, served by both the sync and async views
+ENDPOINTS = {
+    'map list': 'maps/',
+    'public maps': 'maps/public_maps/',
+    'map detail': 'maps/{slug}/',
+    'pins by map': 'pins/by_map/?{query}',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent read throughput of the sync API under WSGI and the "
+        "async views under ASGI, by firing the same requests at two running servers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sync-url',
+            default='http://localhost:8000/api/',
+            help='API root of the WSGI server, e.g. gunicorn config.wsgi.',
+        )
+        parser.add_argument(
+            '--async-url',
+            default='http://localhost:8001/api/async/',
+            help='Async API root of the ASGI server, e.g. uvicorn config.asgi:application.',
+        )
+        parser.add_argument('--token', required=True, help='API token of the user making the requests.')
+        parser.add_argument('--map-slug', required=True, help='Map read by the detail and pin endpoints.')
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help='Number of requests in flight at once.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Number of requests per endpoint and server.',
+        )
+
+    def handle(self, *args, **options):
+        headers = {'Authorization': f"Token {options['token']}", 'Accept': 'application/json'}
+        query = urlencode({'map_slug': options['map_slug']})
+
+        for label, path in ENDPOINTS.items():
+            path = path.format(slug=options['map_slug'], query=query)
+            results = {}
+            for server in ('sync', 'async'):
+                url = options[f'{server}_url'] + path
+                results[server] = self.load(url, headers, options['concurrency'], options['requests'])
+                throughput, latencies, errors = results[server]
+                p50, p95 = self.percentiles(latencies)
+                self.stdout.write(
+                    f"{label} [{server}]: {throughput:.0f} req/s, "
+                    f"p50 {p50:.1f} ms, p95 {p95:.1f} ms, {errors} errors"
+                )
+            if results['sync'][0]:
+                speedup = results['async'][0] / results['sync'][0]
+                self.stdout.write(self.style.SUCCESS(f"{label}: async serves {speedup:.2f}x the requests/s."))
+
+    def load(self, url, headers, concurrency, total):
+        """Fire ``total`` GETs at ``url``; return requests/s, latencies in ms and the error count."""
+        def fetch(_):
+            request = urllib.request.Request(url, headers=headers)
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                    ok = response.status == 200
+            except OSError:
+                # HTTP errors, refused connections and timeouts alike
+                ok = False
+            return (time.perf_counter() - started) * 1000, ok
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                outcomes = list(pool.map(fetch, range(total)))
+        except ValueError as exc:
+            raise CommandError(f"Invalid URL {url!r}: {exc}") from exc
+        elapsed = time.perf_counter() - started
+        latencies = [latency for latency, ok in outcomes if ok]
+        return len(latencies) / elapsed, latencies, total - len(latencies)
+
+    @staticmethod
+    def percentiles(latencies):
+        """Return the median and 95th percentile of latencies, zeros without any."""
+        if len(latencies) < 2:
+            return (latencies[0], latencies[0]) if latencies else (0.0, 0.0)
+        cuts = statistics.quantiles(latencies, n=20)
+        return statistics.median(latencies), cuts[18]
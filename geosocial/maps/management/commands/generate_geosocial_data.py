@@ -0,0 +1,229 @@
+import math
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from geosocial.maps.imports import chunked, write_pins
+from geosocial.maps.models import ContentTypeChoices, IconChoices, Map, MapCollaborator, MapPin
+from geosocial.maps.provisioning import provision_users
+from geosocial.maps.slugs import unique_slugs
+
+KM_PER_DEGREE = 111.32
+
+
+def zipf_sizes(count, total, exponent, rng):
+    """
+    Split ``total`` into ``count`` sizes following Zipf's law, in random order.
+
+    The size of rank ``r`` is proportional to ``1 / r ** exponent``, so a few
+    items are huge and most are small, like pins per map in production.
+    """
+    if not count:
+        return []
+    weights = [1 / rank ** exponent for rank in range(1, count + 1)]
+    scale = total / sum(weights)
+    sizes = [round(weight * scale) for weight in weights]
+    rng.shuffle(sizes)
+    return sizes
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic dataset of users, maps, collaborators and pins for "
+        "load testing, with Zipf-distributed map sizes and pins clustered around hotspots."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Number of users to create.')
+        parser.add_argument(
+            '--maps-per-user',
+            type=int,
+            default=2,
+            help='Maps per user in addition to their default private map.',
+        )
+        parser.add_argument(
+            '--pins-per-map',
+            type=int,
+            default=100,
+            help='Mean number of pins per map; the total is split across maps by --zipf.',
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Zipf exponent of map sizes and hotspot popularity; 0 makes them uniform.',
+        )
+        parser.add_argument(
+            '--collaborators-per-map',
+            type=int,
+            default=2,
+            help='Mean number of collaborators per map.',
+        )
+        parser.add_argument(
+            '--public-ratio',
+            type=float,
+            default=0.3,
+            help='Share of the additional maps that are public; half of those take public contributions.',
+        )
+        parser.add_argument('--hotspots', type=int, default=50, help='Number of centres pins cluster around.')
+        parser.add_argument(
+            '--spread-km',
+            type=float,
+            default=25.0,
+            help='Standard deviation in km of pin positions around their hotspot.',
+        )
+        parser.add_argument('--days', type=int, default=365, help='Pins are timestamped over this many past days.')
+        parser.add_argument('--prefix', default='synthetic', help='Prefix of generated usernames and slugs.')
+        parser.add_argument('--seed', type=int, help='Random seed, for reproducible datasets.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Number of rows written per statement.',
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or not 0 <= options['public_ratio'] <= 1 or options['hotspots'] < 1:
+            raise CommandError("--users and --hotspots must be positive and --public-ratio within 0..1.")
+        self.rng = random.Random(options['seed'])
+        self.options = options
+        started = time.monotonic()
+
+        user_ids = self.create_users()
+        maps = self.create_maps(user_ids)
+        collaborators = self.create_collaborators(maps, user_ids)
+        pins = self.create_pins(maps, collaborators)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(user_ids)} users, {len(maps)} maps, {collaborators['count']} collaborators "
+            f"and {pins} pins in {time.monotonic() - started:.1f}s."
+        ))
+
+    def progress(self, message, done, started):
+        rate = done / max(time.monotonic() - started, 1e-6)
+        self.stdout.write(f"{message} {done} ({rate:.0f}/s)...")
+
+    def create_users(self):
+        """Create users with their default maps; return the user ids."""
+        prefix = self.options['prefix']
+        started = time.monotonic()
+        rows = (
+            {'username': f'{prefix}-user-{index}', 'email': f'{prefix}-user-{index}@example.com'}
+            for index in range(self.options['users'])
+        )
+        created = 0
+        for batch_created, _ in provision_users(rows, self.options['batch_size'], verified_emails=True):
+            created += batch_created
+            self.progress("Created users", created, started)
+        if created < self.options['users']:
+            raise CommandError(f"Users with prefix {prefix!r} already exist; pick another --prefix.")
+        return list(
+            get_user_model().objects.filter(username__startswith=f'{prefix}-user-')
+            .order_by('pk').values_list('pk', flat=True)
+        )
+
+    def create_maps(self, user_ids):
+        """Create the additional maps; return ``(map id, owner id)`` for every map of the users."""
+        prefix = self.options['prefix']
+        ratio = self.options['public_ratio']
+        started = time.monotonic()
+        specs = (
+            (owner_id, index)
+            for owner_id in user_ids
+            for index in range(self.options['maps_per_user'])
+        )
+        created = 0
+        for batch in chunked(specs, self.options['batch_size']):
+            slugs = unique_slugs(f'{prefix}-map-{owner_id}-{index}' for owner_id, index in batch)
+            new_maps = []
+            for (owner_id, index), slug in zip(batch, slugs):
+                public = self.rng.random() < ratio
+                new_maps.append(Map(
+                    name=f'Synthetic map {owner_id}-{index}',
+                    slug=slug,
+                    description='Generated for load testing.',
+                    owner_id=owner_id,
+                    public_view=public,
+                    public_contribution=public and self.rng.random() < 0.5,
+                ))
+            Map.objects.bulk_create(new_maps)
+            created += len(new_maps)
+            self.progress("Created maps", created, started)
+        return list(
+            Map.objects.filter(owner__username__startswith=f'{prefix}-user-').values_list('pk', 'owner_id')
+        )
+
+    def create_collaborators(self, maps, user_ids):
+        """Invite random users to maps; return each map's members and the invite count."""
+        mean = self.options['collaborators_per_map']
+        members = {}
+        invites = []
+        for map_id, owner_id in maps:
+            wanted = min(self.rng.randint(0, 2 * mean), len(user_ids) - 1)
+            chosen = [user_id for user_id in self.rng.sample(user_ids, wanted + 1) if user_id != owner_id][:wanted]
+            members[map_id] = [owner_id, *chosen]
+            invites.extend(MapCollaborator(map_id=map_id, user_id=user_id) for user_id in chosen)
+        for batch in chunked(invites, self.options['batch_size']):
+            MapCollaborator.objects.bulk_create(batch)
+        return {'members': members, 'count': len(invites)}
+
+    def create_pins(self, maps, collaborators):
+        """Write Zipf-sized pin sets clustered around hotspots; return the pin count."""
+        rng = self.rng
+        options = self.options
+        sizes = zipf_sizes(len(maps), len(maps) * options['pins_per_map'], options['zipf'], rng)
+        hotspots = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(options['hotspots'])]
+        popularity = [1 / rank ** options['zipf'] for rank in range(1, len(hotspots) + 1)]
+        spread = options['spread_km'] / KM_PER_DEGREE
+        now = timezone.now()
+        window = options['days'] * 86400
+        content_types = ContentTypeChoices.values
+        icons = IconChoices.values
+
+        def pins():
+            for (map_id, _), size in zip(maps, sizes):
+                members = collaborators['members'][map_id]
+                # Each map stays around a few hotspots, like a real collection
+                centres = rng.choices(hotspots, popularity, k=3)
+                for index in range(size):
+                    lat, lon = rng.choice(centres)
+                    lat = min(max(lat + rng.gauss(0, spread), -89.9), 89.9)
+                    lon = lon + rng.gauss(0, spread) / max(math.cos(math.radians(lat)), 0.01)
+                    lon = (lon + 180) % 360 - 180
+                    moment = now - timedelta(seconds=rng.uniform(0, window))
+                    pin = MapPin(
+                        map_id=map_id,
+                        placed_by_id=rng.choice(members),
+                        name=f'Pin {index}',
+                        latitude=round(lat, 6),
+                        longitude=round(lon, 6),
+                        content_url=f'https://example.com/{map_id}/{index}.jpg',
+                        content_type=rng.choice(content_types),
+                        icon=rng.choice(icons),
+                        timestamp=moment,
+                        created_at=moment,
+                        updated_at=moment,
+                    )
+                    pin.update_geohash()
+                    yield pin
+
+        started = time.monotonic()
+        written = 0
+        for batch in chunked(pins(), options['batch_size']):
+            with transaction.atomic():
+                write_pins(batch)
+            written += len(batch)
+            self.progress("Wrote pins", written, started)
+
+        # Counters are set once at the end instead of per insert
+        counted = [
+            Map(pk=map_id, pins_count=size, collaborators_count=len(collaborators['members'][map_id]) - 1)
+            for (map_id, _), size in zip(maps, sizes)
+        ]
+        Map.objects.bulk_update(counted, ['pins_count', 'collaborators_count'], batch_size=1000)
+        return written
@@ -0,0 +1,83 @@
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from geosocial.maps.imports import chunked, read_csv, read_geojson, validate_pins, write_pins
+from geosocial.maps.models import Map
+
+
+class Command(BaseCommand):
+    help = "Import map pins from a GeoJSON FeatureCollection or a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('map_slug', help='Slug of the map receiving the pins.')
+        parser.add_argument('path', help='GeoJSON or CSV file to import.')
+        parser.add_argument(
+            '--format',
+            choices=['geojson', 'csv'],
+            help='Input format; guessed from the file extension by default.',
+        )
+        parser.add_argument(
+            '--placed-by',
+            help='Username recorded as the author of the pins; defaults to the map owner.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Number of rows validated and written per statement.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            map_instance = Map.objects.get(slug=options['map_slug'])
+        except Map.DoesNotExist:
+            raise CommandError(f"Map {options['map_slug']!r} does not exist.") from None
+
+        placed_by = map_instance.owner
+        if options['placed_by']:
+            User = get_user_model()
+            try:
+                placed_by = User.objects.get(username=options['placed_by'])
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['placed_by']!r} does not exist.") from None
+
+        path = Path(options['path'])
+        file_format = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'geojson')
+        reader = read_csv if file_format == 'csv' else read_geojson
+
+        imported = 0
+        skipped = 0
+        started = time.monotonic()
+        try:
+            with path.open(newline='', encoding='utf-8') as stream:
+                for offset, rows in enumerate(chunked(reader(stream), options['chunk_size'])):
+                    pins, errors = validate_pins(rows, map_instance, placed_by)
+                    if options['verbosity'] > 1:
+                        for index, message in errors:
+                            row_number = offset * options['chunk_size'] + index + 1
+                            self.stderr.write(f"Row {row_number}: {message}")
+                    if pins:
+                        self.write(pins)
+                    imported += len(pins)
+                    skipped += len(errors)
+                    rate = imported / max(time.monotonic() - started, 1e-6)
+                    self.stdout.write(
+                        f"Imported {imported} pins, skipped {skipped} ({rate:.0f} pins/s)..."
+                    )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} pins into {map_instance.slug} "
+            f"in {time.monotonic() - started:.1f}s; skipped {skipped} invalid rows."
+        ))
+
+    def write(self, pins):
+        """Write a chunk of pins and record them on the map in one transaction."""
+        with transaction.atomic():
+            write_pins(pins)
+            Map.record_change(pins[0].map_id, pins=len(pins))
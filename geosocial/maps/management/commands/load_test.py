@@ -0,0 +1,314 @@
+import csv
+import json
+import random
+import statistics
+import time
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Share of iterations spent in each scenario, roughly the production traffic mix
+DEFAULT_MIX = 'browse=45,poll=35,pin_burst=10,invite=5,login=5'
+
+
+class LoadTestError(Exception):
+    """A scenario cannot continue, e.g. a login was refused."""
+
+
+class VirtualUser:
+    """
+    One simulated client: logs in for a token, then runs weighted scenarios.
+
+    Every request is recorded as ``(scenario, latency in ms, ok)``. Network
+    failures and unexpected statuses count as errors; ``304 Not Modified``
+    answers to polls are successes.
+    """
+
+    def __init__(self, base_url, credentials, options, rng):
+        self.base_url = base_url.rstrip('/')
+        self.username, self.password = credentials
+        self.options = options
+        self.rng = rng
+        self.records = []
+        self.token = None
+        self.user_id = None
+        self.own_maps = []
+        self.visible_slugs = []
+        self.open_maps = []
+        self.etags = {}
+
+    def request(self, scenario, method, path, data=None, headers=None, expect=(200,)):
+        """Send a request; record it under ``scenario`` and return ``(status, headers, decoded body)``."""
+        headers = {'Accept': 'application/json', **(headers or {})}
+        if self.token:
+            headers['Authorization'] = f'Token {self.token}'
+        body = None
+        if data is not None:
+            body = json.dumps(data).encode()
+            headers['Content-Type'] = 'application/json'
+        request = urllib.request.Request(f'{self.base_url}/{path}', data=body, headers=headers, method=method)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.options['timeout']) as response:
+                status, response_headers, content = response.status, response.headers, response.read()
+        except HTTPError as exc:
+            status, response_headers, content = exc.code, exc.headers, b''
+        except OSError:
+            # Refused connections and timeouts
+            status, response_headers, content = None, {}, b''
+        self.records.append((scenario, (time.perf_counter() - started) * 1000, status in expect))
+        try:
+            decoded = json.loads(content) if content else None
+        except ValueError:
+            decoded = None
+        return status, response_headers, decoded
+
+    def login(self):
+        """Get an API token through ``CustomObtainAuthToken``; a failed login keeps the old token."""
+        token, self.token = self.token, None
+        status, _, data = self.request(
+            'login', 'POST', 'api/auth-token/', {'username': self.username, 'password': self.password}
+        )
+        self.token = token
+        if status != 200 or not data:
+            raise LoadTestError(f"Login of {self.username!r} failed with status {status}.")
+        self.token = data['token']
+        self.user_id = data['user_id']
+
+    def discover(self):
+        """Load the maps the user owns and can see, as a client does on start."""
+        _, _, own = self.request('browse', 'GET', 'api/maps/my_maps/')
+        self.own_maps = own or []
+        _, _, visible = self.request('browse', 'GET', 'api/maps/')
+        visible = visible or []
+        self.visible_slugs = [map_data['slug'] for map_data in visible]
+        self.open_maps = [map_data['id'] for map_data in visible if map_data.get('public_contribution')]
+
+    def browse(self):
+        """List maps and public maps, then open one of them."""
+        self.request('browse', 'GET', 'api/maps/')
+        _, _, public = self.request('browse', 'GET', 'api/maps/public_maps/')
+        slugs = self.visible_slugs + [map_data['slug'] for map_data in public or []]
+        if slugs:
+            self.request('browse', 'GET', f'api/maps/{self.rng.choice(slugs)}/')
+
+    def poll(self):
+        """Poll a map's pins like the live map view, revalidating with the last ``ETag``."""
+        if not self.visible_slugs:
+            return
+        slug = self.rng.choice(self.visible_slugs)
+        headers = {'If-None-Match': self.etags[slug]} if slug in self.etags else {}
+        status, response_headers, _ = self.request(
+            'poll', 'GET', f"api/pins/by_map/?{urlencode({'map_slug': slug})}", headers=headers, expect=(200, 304)
+        )
+        if status == 200 and response_headers.get('ETag'):
+            self.etags[slug] = response_headers['ETag']
+
+    def pin_burst(self):
+        """Drop a burst of pins on a map open to public contributions."""
+        maps = self.open_maps or [map_data['id'] for map_data in self.own_maps]
+        if not maps:
+            return
+        map_id = self.rng.choice(maps)
+        lat, lon = self.rng.uniform(-60, 70), self.rng.uniform(-180, 180)
+        for index in range(self.options['burst_size']):
+            self.request('pin_burst', 'POST', 'api/pins/', {
+                'map': map_id,
+                'name': f'Load test pin {index}',
+                'latitude': f'{lat + self.rng.gauss(0, 0.01):.6f}',
+                'longitude': f'{lon + self.rng.gauss(0, 0.01):.6f}',
+                'content_url': 'https://example.com/load-test.jpg',
+            }, expect=(201,))
+
+    def invite(self, user_ids):
+        """Invite another user to one of the user's maps, then remove them again."""
+        others = [user_id for user_id in user_ids if user_id != self.user_id]
+        if not self.own_maps or not others:
+            return
+        map_id = self.rng.choice(self.own_maps)['id']
+        status, _, data = self.request(
+            'invite', 'POST', 'api/collaborators/', {'map': map_id, 'user_id': self.rng.choice(others)},
+            expect=(201, 400),  # 400 when the user already collaborates on the map
+        )
+        if status == 201:
+            self.request('invite', 'DELETE', f"api/collaborators/{data['id']}/", expect=(204,))
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent end-to-end load scenarios against a running server, mixing token "
+        "logins, map browsing, by_map polling, pin bursts and collaborator invites, and "
+        "report latency percentiles and error rates per scenario. The server needs "
+        "DJANGO_API_TOKEN_LOGIN enabled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'credentials',
+            help=(
+                'CSV file with username and password columns of existing users with verified emails, '
+                'e.g. the provision_users --verified-emails input.'
+            ),
+        )
+        parser.add_argument('--base-url', default='http://localhost:8000/', help='Root URL of the server.')
+        parser.add_argument('--users', type=int, default=20, help='Number of concurrent virtual users.')
+        parser.add_argument('--duration', type=float, default=60, help='Seconds to run the scenarios for.')
+        parser.add_argument(
+            '--mix',
+            default=DEFAULT_MIX,
+            help=f'Comma-separated scenario=weight pairs, by default {DEFAULT_MIX}.',
+        )
+        parser.add_argument('--burst-size', type=int, default=10, help='Pins created per pin burst.')
+        parser.add_argument(
+            '--think-time',
+            type=float,
+            default=0.5,
+            help='Mean pause in seconds between scenarios of a virtual user.',
+        )
+        parser.add_argument('--timeout', type=float, default=30, help='Request timeout in seconds.')
+        parser.add_argument('--seed', type=int, help='Random seed of the scenario choices.')
+        parser.add_argument('--output', help='File to write the per-scenario results to as JSON.')
+        parser.add_argument(
+            '--max-error-rate',
+            type=float,
+            help='Fail when any scenario has a higher share of failed requests, e.g. 0.01.',
+        )
+
+    def handle(self, *args, **options):
+        credentials = self.load_credentials(options['credentials'])
+        mix = self.parse_mix(options['mix'])
+        rng = random.Random(options['seed'])
+        clients = [
+            VirtualUser(options['base_url'], credentials[index % len(credentials)], options,
+                        random.Random(rng.random()))
+            for index in range(options['users'])
+        ]
+
+        self.stdout.write(f"Logging in {len(clients)} virtual users...")
+        with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+            failures = [error for error in pool.map(self.start, clients) if error]
+        if len(failures) == len(clients):
+            raise CommandError(failures[0])
+        for failure in failures:
+            self.stderr.write(failure)
+        clients = [client for client in clients if client.token]
+        user_ids = sorted({client.user_id for client in clients})
+
+        self.stdout.write(f"Running scenarios for {options['duration']:.0f}s...")
+        deadline = time.monotonic() + options['duration']
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+            list(pool.map(lambda client: self.run(client, mix, user_ids, deadline), clients))
+        elapsed = time.monotonic() - started
+
+        results = self.summarize([record for client in clients for record in client.records], elapsed)
+        for result in results:
+            self.stdout.write(
+                f"{result['scenario']}: {result['requests']} requests ({result['rps']:.1f}/s), "
+                f"p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, "
+                f"{result['error_rate']:.2%} errors"
+            )
+        if options['output']:
+            Path(options['output']).write_text(json.dumps({
+                'users': len(clients),
+                'duration': elapsed,
+                'mix': mix,
+                'results': results,
+            }, indent=2), encoding='utf-8')
+            self.stdout.write(f"Wrote results to {options['output']}.")
+
+        limit = options['max_error_rate']
+        failing = [result['scenario'] for result in results if limit is not None and result['error_rate'] > limit]
+        if failing:
+            raise CommandError(f"Error rate above {limit:.2%} in: {', '.join(failing)}.")
+        self.stdout.write(self.style.SUCCESS("Load test finished."))
+
+    def load_credentials(self, path):
+        try:
+            with Path(path).open(newline='', encoding='utf-8') as stream:
+                reader = csv.DictReader(stream)
+                if not {'username', 'password'} <= set(reader.fieldnames or ()):
+                    raise CommandError("The CSV file needs username and password columns.")
+                credentials = [(row['username'], row['password']) for row in reader if row['username']]
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+        if not credentials:
+            raise CommandError("The CSV file has no users.")
+        return credentials
+
+    def parse_mix(self, mix):
+        """Parse ``scenario=weight`` pairs into a dict of weights."""
+        weights = {}
+        try:
+            for pair in mix.split(','):
+                scenario, weight = pair.split('=')
+                weights[scenario.strip()] = float(weight)
+        except ValueError as exc:
+            raise CommandError(f"Invalid --mix {mix!r}; expected scenario=weight pairs.") from exc
+        unknown = set(weights) - {'browse', 'poll', 'pin_burst', 'invite', 'login'}
+        if unknown:
+            raise CommandError(f"Unknown scenarios in --mix: {', '.join(sorted(unknown))}.")
+        if not any(weight > 0 for weight in weights.values()):
+            raise CommandError("--mix needs at least one positive weight.")
+        return weights
+
+    @staticmethod
+    def start(client):
+        """Log a virtual user in and load its maps; return an error message on failure."""
+        try:
+            client.login()
+            client.discover()
+        except LoadTestError as exc:
+            return str(exc)
+        return None
+
+    @staticmethod
+    def run(client, mix, user_ids, deadline):
+        """Run weighted scenarios for one virtual user until ``deadline``."""
+        scenarios = list(mix)
+        weights = [mix[scenario] for scenario in scenarios]
+        while time.monotonic() < deadline:
+            scenario = client.rng.choices(scenarios, weights)[0]
+            try:
+                if scenario == 'invite':
+                    client.invite(user_ids)
+                else:
+                    getattr(client, scenario)()
+            except LoadTestError:
+                # The failed login is already recorded as an error
+                pass
+            think = client.options['think_time']
+            if think:
+                time.sleep(min(client.rng.expovariate(1 / think), max(deadline - time.monotonic(), 0)))
+
+    @staticmethod
+    def summarize(records, elapsed):
+        """Aggregate ``(scenario, latency, ok)`` records into per-scenario statistics."""
+        by_scenario = defaultdict(list)
+        for scenario, latency, ok in records:
+            by_scenario[scenario].append((latency, ok))
+        results = []
+        for scenario, rows in sorted(by_scenario.items()):
+            latencies = sorted(latency for latency, _ in rows)
+            errors = sum(1 for _, ok in rows if not ok)
+            if len(latencies) > 1:
+                cuts = statistics.quantiles(latencies, n=100)
+                p50, p95, p99 = statistics.median(latencies), cuts[94], cuts[98]
+            else:
+                p50 = p95 = p99 = latencies[0]
+            results.append({
+                'scenario': scenario,
+                'requests': len(rows),
+                'rps': len(rows) / max(elapsed, 1e-6),
+                'errors': errors,
+                'error_rate': errors / len(rows),
+                'p50_ms': p50,
+                'p95_ms': p95,
+                'p99_ms': p99,
+            })
+        return results
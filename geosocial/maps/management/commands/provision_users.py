@@ -0,0 +1,55 @@
+import csv
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from geosocial.maps.provisioning import provision_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users and their default private maps in bulk from a CSV file "
+        "with a username column and optional email, name and password columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file of users to create.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of users inserted per transaction.',
+        )
+        parser.add_argument(
+            '--verified-emails',
+            action='store_true',
+            help='Mark the email addresses as verified, e.g. for addresses owned by the organisation.',
+        )
+
+    def handle(self, *args, **options):
+        created = 0
+        skipped = 0
+        started = time.monotonic()
+        try:
+            with Path(options['path']).open(newline='', encoding='utf-8') as stream:
+                reader = csv.DictReader(stream)
+                if 'username' not in (reader.fieldnames or ()):
+                    raise CommandError("The CSV file has no username column.")
+                rows = (row for row in reader if row['username'])
+                for batch_created, batch_skipped in provision_users(
+                    rows, options['batch_size'], options['verified_emails']
+                ):
+                    created += batch_created
+                    skipped += batch_skipped
+                    rate = created / max(time.monotonic() - started, 1e-6)
+                    self.stdout.write(
+                        f"Created {created} users, skipped {skipped} ({rate:.0f} users/s)..."
+                    )
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Provisioned {created} users with default maps "
+            f"in {time.monotonic() - started:.1f}s; skipped {skipped} duplicate or existing usernames."
+        ))
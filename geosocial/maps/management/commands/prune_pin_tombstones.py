@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from geosocial.maps.models import MapPinTombstone
+
+
+class Command(BaseCommand):
+    help = "Delete pin tombstones older than the sync retention window, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.MAPS_TOMBSTONE_RETENTION_DAYS,
+            help='Keep tombstones younger than this many days.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Number of tombstones deleted per statement.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        expired = MapPinTombstone.objects.filter(deleted_at__lt=cutoff).order_by()
+
+        deleted = 0
+        while True:
+            ids = list(expired.values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += MapPinTombstone.objects.filter(pk__in=ids).delete()[0]
+            self.stdout.write(f"Deleted {deleted} tombstones...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {deleted} pin tombstones older than {options['days']} days."
+        ))
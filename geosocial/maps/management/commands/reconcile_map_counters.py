@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from geosocial.maps.models import Map, MapCollaborator, MapPin
+
+
+def _count(model):
+    """Subquery counting the rows of ``model`` that belong to the outer map."""
+    return Coalesce(Subquery(
+        model.objects.filter(map=OuterRef('pk')).order_by()
+        .values('map').annotate(count=Count('pk')).values('count')
+    ), 0)
+
+
+class Command(BaseCommand):
+    help = "Recount the denormalized pin and collaborator counters of maps in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of maps checked per statement.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Map.objects.order_by('pk')
+
+        checked = 0
+        repaired = 0
+        last_pk = None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            ids = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                drifted = list(
+                    Map.objects.filter(pk__in=ids)
+                    .annotate(
+                        actual_pins=_count(MapPin),
+                        actual_collaborators=_count(MapCollaborator),
+                    )
+                    .exclude(
+                        pins_count=F('actual_pins'),
+                        collaborators_count=F('actual_collaborators'),
+                    )
+                    .values_list('pk', flat=True)
+                )
+                if drifted:
+                    Map.objects.filter(pk__in=drifted).update(
+                        pins_count=_count(MapPin),
+                        collaborators_count=_count(MapCollaborator),
+                    )
+            last_pk = ids[-1]
+            checked += len(ids)
+            repaired += len(drifted)
+            self.stdout.write(f"Checked {checked} maps...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled counters of {checked} maps; repaired {repaired}."
+        ))
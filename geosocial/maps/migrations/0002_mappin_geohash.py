@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-17 16:25
+
+from django.db import migrations, models
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(lat, lon, precision=12):
+    """Frozen copy of ``geosocial.maps.spatial.encode_geohash``."""
+    lat, lon = float(lat), float(lon)
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, interval = (lon, lon_range) if even else (lat, lat_range)
+        mid = (interval[0] + interval[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            interval[0] = mid
+        else:
+            bits <<= 1
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def backfill_geohash(apps, schema_editor):
+    """Compute the geohash of existing pins in batches."""
+    MapPin = apps.get_model('maps', 'MapPin')
+    while True:
+        pins = list(
+            MapPin.objects.filter(geohash='')
+            .only('id', 'latitude', 'longitude')
+            .order_by('pk')[:2000]
+        )
+        if not pins:
+            break
+        for pin in pins:
+            pin.geohash = encode_geohash(pin.latitude, pin.longitude)
+        MapPin.objects.bulk_update(pins, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maps', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mappin',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12, verbose_name='Geohash'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='mappin',
+            index=models.Index(fields=['map', 'geohash'], name='maps_mappin_map_id_88768e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mappin',
+            index=models.Index(fields=['geohash'], name='maps_mappin_geohash_99baff_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    """Count the existing pins and collaborators of every map."""
+    Map = apps.get_model('maps', 'Map')
+    MapPin = apps.get_model('maps', 'MapPin')
+    MapCollaborator = apps.get_model('maps', 'MapCollaborator')
+    Map.objects.update(
+        pins_count=Coalesce(Subquery(
+            MapPin.objects.filter(map=OuterRef('pk')).order_by()
+            .values('map').annotate(count=Count('pk')).values('count')
+        ), 0),
+        collaborators_count=Coalesce(Subquery(
+            MapCollaborator.objects.filter(map=OuterRef('pk')).order_by()
+            .values('map').annotate(count=Count('pk')).values('count')
+        ), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maps', '0002_mappin_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='map',
+            name='pins_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Pins Count'),
+        ),
+        migrations.AddField(
+            model_name='map',
+            name='collaborators_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Collaborators Count'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
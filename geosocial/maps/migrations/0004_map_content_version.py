@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maps', '0003_map_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='map',
+            name='content_version',
+            field=models.PositiveBigIntegerField(default=1, editable=False, verbose_name='Content Version'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-17 18:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maps', '0004_map_content_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MapPinTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pin_id', models.UUIDField(verbose_name='Pin ID')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Deleted At')),
+                ('map', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='pin_tombstones', to='maps.map', verbose_name='Map')),
+            ],
+            options={
+                'verbose_name': 'Map Pin Tombstone',
+                'verbose_name_plural': 'Map Pin Tombstones',
+                'ordering': ['deleted_at'],
+                'indexes': [
+                    models.Index(fields=['map', 'deleted_at'], name='maps_mappin_map_id_e980b8_idx'),
+                    models.Index(fields=['deleted_at'], name='maps_mappin_deleted_e278e0_idx'),
+                ],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='mappin',
+            index=models.Index(fields=['map', 'updated_at', 'id'], name='maps_mappin_map_id_7f9130_idx'),
+        ),
+    ]
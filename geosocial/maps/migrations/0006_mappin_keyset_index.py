@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maps', '0005_mappintombstone'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='mappin',
+            name='maps_mappin_map_id_652d50_idx',
+        ),
+        migrations.AddIndex(
+            model_name='mappin',
+            index=models.Index(fields=['map', 'timestamp', 'id'], name='maps_mappin_map_id_b608bd_idx'),
+        ),
+    ]
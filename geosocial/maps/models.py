@@ -1,8 +1,16 @@
 import uuid
+from collections import defaultdict
+
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from geosocial.maps.events import publish_pin_event
+from geosocial.maps.spatial import encode_geohash
+
 
 class MapStyleChoices(models.TextChoices):
     """Style choices for maps."""
@@ -32,6 +40,13 @@ class Map(models.Model):
     )
     public_view = models.BooleanField(_('Public View'), default=False)
     public_contribution = models.BooleanField(_('Public Contribution'), default=False)
+    # Denormalized counters, kept in sync by signals and bulk write paths
+    pins_count = models.PositiveIntegerField(_('Pins Count'), default=0, editable=False)
+    collaborators_count = models.PositiveIntegerField(
+        _('Collaborators Count'), default=0, editable=False
+    )
+    # Bumped on every pin or collaborator change
+    content_version = models.PositiveBigIntegerField(_('Content Version'), default=1, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -43,6 +58,42 @@ class Map(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded owner so a transfer invalidates both owners' access."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_owner_id = instance.__dict__.get('owner_id')
+        return instance
+
+    @classmethod
+    def record_change(cls, map_id, pins=0, collaborators=0):
+        """
+        Record a change to a map's pins or collaborators.
+
+        Bumps ``content_version`` and ``updated_at``, which the API uses for
+        ``ETag``/``Last-Modified``, and atomically adds to the denormalized
+        counters.
+        """
+        changes = {
+            'content_version': F('content_version') + 1,
+            'updated_at': timezone.now(),
+        }
+        if pins:
+            changes['pins_count'] = Greatest(F('pins_count') + pins, 0)
+        if collaborators:
+            changes['collaborators_count'] = Greatest(F('collaborators_count') + collaborators, 0)
+        cls.objects.filter(pk=map_id).update(**changes)
+
+    @property
+    def version(self):
+        """Identifier of the current state of the map, its pins and collaborators."""
+        return f'{self.content_version}-{self.updated_at.timestamp():.6f}'
+
+    @property
+    def etag(self):
+        """Validator for representations of the map and its pins."""
+        return f'"{self.pk}-{self.version}"'
+
 
 class ContentTypeChoices(models.TextChoices):
     """Content type choices for map pins."""
@@ -65,6 +116,29 @@ class IconChoices(models.TextChoices):
     MARKER = 'marker', _('Marker')
 
 
+class MapPinQuerySet(models.QuerySet):
+    """Pin queries whose bulk deletes are recorded once per map."""
+
+    def delete(self):
+        """
+        Delete the pins and record the change once per map.
+
+        The ``post_delete`` receiver collects each deleted pin into
+        ``deleted_pins`` rather than recording it, so every affected map gets
+        one counter update, one batch of tombstones and one event.
+        """
+        self.deleted_pins = defaultdict(list)
+        with transaction.atomic(using=self.db, savepoint=False):
+            deleted = super().delete()
+            for map_id, pin_ids in self.deleted_pins.items():
+                Map.record_change(map_id, pins=-len(pin_ids))
+                MapPinTombstone.objects.bulk_create(
+                    [MapPinTombstone(map_id=map_id, pin_id=pin_id) for pin_id in pin_ids]
+                )
+                publish_pin_event(map_id, 'deleted', [{'id': str(pin_id)} for pin_id in pin_ids])
+        return deleted
+
+
 class MapPin(models.Model):
     """Map pin model for storing pin information on maps."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -95,6 +169,8 @@ class MapPin(models.Model):
         decimal_places=6,
         help_text=_('Longitude coordinate (-180 to 180)')
     )
+    # Spatial key derived from latitude/longitude, kept in sync on save
+    geohash = models.CharField(_('Geohash'), max_length=12, editable=False, blank=True)
     timestamp = models.DateTimeField(_('Timestamp'), auto_now_add=True)
     content_url = models.URLField(_('Content URL'), max_length=500)
     content_type = models.CharField(
@@ -112,18 +188,69 @@ class MapPin(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = MapPinQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Map Pin')
         verbose_name_plural = _('Map Pins')
         ordering = ['-timestamp']
         indexes = [
-            models.Index(fields=['map', 'timestamp']),
+            models.Index(fields=['map', 'timestamp', 'id']),
             models.Index(fields=['latitude', 'longitude']),
+            models.Index(fields=['map', 'geohash']),
+            models.Index(fields=['geohash']),
+            models.Index(fields=['map', 'updated_at', 'id']),
         ]
 
     def __str__(self):
         return f"{self.name} on {self.map.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded map so moving a pin can update both counters."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_map_id = instance.__dict__.get('map_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Keep the geohash in sync with the coordinates."""
+        self.update_geohash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
+    def update_geohash(self):
+        """Recompute the geohash; needed before ``bulk_create``/``bulk_update``."""
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+
+
+class MapPinTombstone(models.Model):
+    """Record of a pin that left a map, for clients syncing changes."""
+    # No foreign key constraint: tombstones are written while a pin's map
+    # may itself be deleted in the same transaction.
+    map = models.ForeignKey(
+        Map,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='pin_tombstones',
+        verbose_name=_('Map')
+    )
+    pin_id = models.UUIDField(_('Pin ID'))
+    deleted_at = models.DateTimeField(_('Deleted At'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Map Pin Tombstone')
+        verbose_name_plural = _('Map Pin Tombstones')
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['map', 'deleted_at']),
+            models.Index(fields=['deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"Pin {self.pin_id} removed from map {self.map_id}"
+
 
 class MapCollaborator(models.Model):
     """Map collaborator model for managing map collaborations."""
@@ -0,0 +1,138 @@
+"""
+Minimal Mapbox Vector Tile encoder for point features.
+
+Implements the subset of the `vector tile specification
+<https://github.com/mapbox/vector-tile-spec/tree/master/2.1>`_ needed to ship
+map pins: one or more layers of ``POINT`` features with string attributes.
+The protobuf wire format is written by hand so no extra dependency is needed.
+"""
+import math
+
+from geosocial.maps.spatial import BoundingBox
+
+EXTENT = 4096
+MAX_LATITUDE = 85.0511287798
+
+# Protobuf wire types
+_VARINT = 0
+_LENGTH_DELIMITED = 2
+
+# Geometry command and type constants from the specification
+_MOVE_TO = 1
+_POINT = 1
+
+
+def tile_bounds(zoom, x, y):
+    """Return the longitude/latitude box covered by a web mercator tile."""
+    n = 2 ** zoom
+    return BoundingBox(
+        min_lon=x / n * 360.0 - 180.0,
+        min_lat=_tile_latitude(y + 1, n),
+        max_lon=(x + 1) / n * 360.0 - 180.0,
+        max_lat=_tile_latitude(y, n),
+    )
+
+
+def _tile_latitude(y, n):
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+
+
+def tile_coordinates(lat, lon, zoom, x, y, extent=EXTENT):
+    """Project a point to integer coordinates local to a tile."""
+    lat = max(min(float(lat), MAX_LATITUDE), -MAX_LATITUDE)
+    n = 2 ** zoom
+    world_x = (float(lon) + 180.0) / 360.0 * n
+    lat_rad = math.radians(lat)
+    world_y = (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
+    return (
+        int(round((world_x - x) * extent)),
+        int(round((world_y - y) * extent)),
+    )
+
+
+def encode_tile(layers, extent=EXTENT):
+    """
+    Encode a vector tile.
+
+    ``layers`` maps a layer name to a list of ``(x, y, properties)`` point
+    features, where ``x``/``y`` are tile-local coordinates and ``properties``
+    is a dict of string attributes.
+    """
+    tile = bytearray()
+    for name, features in layers.items():
+        _write_message(tile, 3, _encode_layer(name, features, extent))
+    return bytes(tile)
+
+
+def _encode_layer(name, features, extent):
+    keys = {}
+    values = {}
+    layer = bytearray()
+    _write_varint_field(layer, 15, 2)
+    _write_bytes(layer, 1, name.encode())
+
+    for x, y, properties in features:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault(str(value), len(values)))
+
+        feature = bytearray()
+        _write_packed(feature, 2, tags)
+        _write_varint_field(feature, 3, _POINT)
+        _write_packed(feature, 4, [
+            _command(_MOVE_TO, 1), _zigzag(x), _zigzag(y),
+        ])
+        _write_message(layer, 2, feature)
+
+    for key in keys:
+        _write_bytes(layer, 3, key.encode())
+    for value in values:
+        encoded = bytearray()
+        _write_bytes(encoded, 1, value.encode())
+        _write_message(layer, 4, encoded)
+    _write_varint_field(layer, 5, extent)
+    return layer
+
+
+def _command(command_id, count):
+    return (command_id & 0x7) | (count << 3)
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 31)
+
+
+def _write_varint(buffer, value):
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _write_key(buffer, field_number, wire_type):
+    _write_varint(buffer, (field_number << 3) | wire_type)
+
+
+def _write_varint_field(buffer, field_number, value):
+    _write_key(buffer, field_number, _VARINT)
+    _write_varint(buffer, value)
+
+
+def _write_bytes(buffer, field_number, value):
+    _write_key(buffer, field_number, _LENGTH_DELIMITED)
+    _write_varint(buffer, len(value))
+    buffer.extend(value)
+
+
+def _write_message(buffer, field_number, message):
+    _write_bytes(buffer, field_number, message)
+
+
+def _write_packed(buffer, field_number, values):
+    packed = bytearray()
+    for value in values:
+        _write_varint(packed, value)
+    _write_bytes(buffer, field_number, packed)
@@ -0,0 +1,82 @@
+"""
+Default maps for new users, one at a time or in bulk.
+
+Signups get their default private map from the ``post_save`` receiver
+:func:`geosocial.maps.signals.create_user_default_map`. Onboarding a whole
+organisation instead goes through :func:`provision_users`, which inserts
+users with ``bulk_create`` (sending no ``post_save``, so the receiver does
+not run for them) and creates their maps in the same batches.
+"""
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+
+from geosocial.maps.imports import chunked
+from geosocial.maps.models import Map
+from geosocial.maps.slugs import unique_slugs
+
+USER_FIELDS = ('username', 'email', 'name')
+
+
+def default_map_slug(user):
+    """Base slug of a user's default map."""
+    return f"{user.username}-private"
+
+
+def default_map(user, slug):
+    """Build the unsaved default private map of a user."""
+    return Map(
+        name=_("My Private Map"),
+        slug=slug,
+        description=_("Welcome to your private map! Start exploring and see how easy it is to map your story!"),
+        owner=user,
+        public_view=False,  # Private by default
+        public_contribution=False,  # Only owner can contribute
+    )
+
+
+def provision_users(rows, batch_size=1000, verified_emails=False):
+    """
+    Create users with their default private maps in batches.
+
+    ``rows`` is an iterable of dicts with a ``username`` and optionally an
+    ``email``, ``name`` and plain-text ``password``; users without a password
+    get an unusable one and sign in after a password reset. Usernames that
+    already exist, or repeat earlier in ``rows``, are skipped. Each batch is
+    one transaction: the users, their email addresses and their maps are
+    each a single ``bulk_create``, and the map slugs a single query.
+
+    Yields ``(created, skipped)`` counts after every batch.
+    """
+    User = get_user_model()
+    seen = set()
+    for batch in chunked(rows, batch_size):
+        usernames = [row['username'] for row in batch]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        users = []
+        for row in batch:
+            if row['username'] in existing or row['username'] in seen:
+                continue
+            seen.add(row['username'])
+            user = User(**{field: row[field] for field in USER_FIELDS if row.get(field)})
+            # Hashing is the slowest step; skip it for password-less accounts
+            user.password = make_password(row.get('password') or None)
+            users.append(user)
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            if any(user.pk is None for user in users):
+                # The database cannot return ids from a bulk insert
+                ids = dict(User.objects.filter(username__in=[user.username for user in users])
+                           .values_list('username', 'pk'))
+                for user in users:
+                    user.pk = ids[user.username]
+            EmailAddress.objects.bulk_create([
+                EmailAddress(user=user, email=user.email, primary=True, verified=verified_emails)
+                for user in users if user.email
+            ])
+            slugs = unique_slugs(default_map_slug(user) for user in users)
+            Map.objects.bulk_create([default_map(user, slug) for user, slug in zip(users, slugs)])
+        yield len(users), len(batch) - len(users)
@@ -0,0 +1,120 @@
+"""
+Versioned response cache for reads that are the same for every viewer.
+
+Entries are keyed by a scope (which map or listing), a version that changes
+whenever the underlying data does, and the request variant: host, path,
+query string, negotiated format and active language. Writes never delete entries; bumping
+the version (see ``Map.record_change``) makes old keys unreachable and they
+expire after ``MAPS_RESPONSE_CACHE_TIMEOUT``.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.translation import get_language
+
+STATS_KEYS = {
+    'hits': 'maps:response-cache:hits',
+    'misses': 'maps:response-cache:misses',
+}
+# Headers restored on a cache hit
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Vary', 'Cache-Control', 'Content-Disposition')
+
+
+def response_cache_key(request, scope, version):
+    """Build the cache key of a request's response for a scope and version."""
+    accepted_renderer = getattr(request, 'accepted_renderer', None)
+    variant = '\n'.join([
+        request.get_host(),
+        request.path,
+        '&'.join(sorted(request.META.get('QUERY_STRING', '').split('&'))),
+        getattr(accepted_renderer, 'format', '') or '',
+        get_language() or '',
+    ])
+    digest = hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest()
+    return f'maps:response:{scope}:{version}:{digest}'
+
+
+def _record(stat):
+    key = STATS_KEYS[stat]
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter was evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def response_cache_stats():
+    """Return the hit and miss counters of the response cache."""
+    values = cache.get_many(STATS_KEYS.values())
+    return {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()}
+
+
+def _hit_response(cached):
+    """Rebuild a response from a cache entry."""
+    content, headers = cached
+    response = HttpResponse(content)
+    for header, value in headers.items():
+        response[header] = value
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def _cache_entry(response):
+    """Return the cache entry of a response, or ``None`` if it must not be stored."""
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return None
+    headers = {header: response[header] for header in CACHED_HEADERS if response.has_header(header)}
+    return response.content, headers
+
+
+def cached_response(request, scope, version, build_response):
+    """
+    Serve a response from the cache, or build, render and store it.
+
+    ``build_response`` must return a rendered response. Only successful,
+    non-streaming responses that set no cookies are stored. Responses carry
+    an ``X-Cache`` header of ``HIT`` or ``MISS``.
+    """
+    key = response_cache_key(request, scope, version)
+    cached = cache.get(key)
+    if cached is not None:
+        _record('hits')
+        return _hit_response(cached)
+
+    _record('misses')
+    response = build_response()
+    entry = _cache_entry(response)
+    if entry is not None:
+        cache.set(key, entry, settings.MAPS_RESPONSE_CACHE_TIMEOUT)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+async def _arecord(stat):
+    key = STATS_KEYS[stat]
+    await cache.aadd(key, 0, timeout=None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        # The counter was evicted between add() and incr()
+        await cache.aset(key, 1, timeout=None)
+
+
+async def acached_response(request, scope, version, build_response):
+    """Async counterpart of :func:`cached_response`; ``build_response`` is a coroutine function."""
+    key = response_cache_key(request, scope, version)
+    cached = await cache.aget(key)
+    if cached is not None:
+        await _arecord('hits')
+        return _hit_response(cached)
+
+    await _arecord('misses')
+    response = await build_response()
+    entry = _cache_entry(response)
+    if entry is not None:
+        await cache.aset(key, entry, settings.MAPS_RESPONSE_CACHE_TIMEOUT)
+    response['X-Cache'] = 'MISS'
+    return response
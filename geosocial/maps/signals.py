@@ -1,10 +1,18 @@
+import weakref
+
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.utils.text import slugify
-from django.utils.translation import gettext_lazy as _
 
-from .models import Map
+from .access import invalidate_map_access
+from .events import pin_payload, publish_pin_event
+from .models import Map, MapCollaborator, MapPin, MapPinQuerySet, MapPinTombstone
+from .provisioning import default_map, default_map_slug
+from .slugs import create_with_unique_slug
+
+# Maps being deleted by each delete() call, keyed by the call's origin
+_deleted_maps = weakref.WeakKeyDictionary()
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -19,22 +27,84 @@ def create_user_default_map(sender, instance, created, **kwargs):
         **kwargs: Additional keyword arguments
     """
     if created:
-        # Create a unique slug for the user's default map
-        base_slug = f"{instance.username}-private"
-        slug = base_slug
-        counter = 1
-        
-        # Ensure slug uniqueness
-        while Map.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-        
-        # Create the default private map
-        Map.objects.create(
-            name=_("My Private Map"),
-            slug=slug,
-            description=_("Welcome to your private map! Start exploring and see how easy it is to map your story!"),
-            owner=instance,
-            public_view=False,  # Private by default
-            public_contribution=False,  # Only owner can contribute
-        )
\ No newline at end of file
+        def create(slug):
+            map_instance = default_map(instance, slug)
+            map_instance.save(force_insert=True)
+            return map_instance
+
+        # Create the default private map under a unique slug
+        create_with_unique_slug(default_map_slug(instance), create)
+
+
+@receiver(post_save, sender=MapPin)
+def record_saved_pin(sender, instance, created, **kwargs):
+    """Record a created, edited or moved pin on its map's counters and version, and publish it."""
+    loaded_map_id = getattr(instance, '_loaded_map_id', None)
+    if created:
+        Map.record_change(instance.map_id, pins=1)
+        publish_pin_event(instance.map_id, 'created', [pin_payload(instance)])
+    elif loaded_map_id is not None and loaded_map_id != instance.map_id:
+        Map.record_change(loaded_map_id, pins=-1)
+        Map.record_change(instance.map_id, pins=1)
+        MapPinTombstone.objects.create(map_id=loaded_map_id, pin_id=instance.pk)
+        publish_pin_event(loaded_map_id, 'deleted', [{'id': str(instance.pk)}])
+        publish_pin_event(instance.map_id, 'created', [pin_payload(instance)])
+    else:
+        Map.record_change(instance.map_id)
+        publish_pin_event(instance.map_id, 'updated', [pin_payload(instance)])
+    instance._loaded_map_id = instance.map_id
+
+
+@receiver(pre_delete, sender=Map)
+def remember_deleted_map(sender, instance, origin=None, **kwargs):
+    """Note a map about to be deleted, before the pins and collaborators cascading with it."""
+    if origin is not None:
+        _deleted_maps.setdefault(origin, set()).add(instance.pk)
+
+
+def deleted_with_map(instance, origin):
+    """Whether ``instance`` is deleted along with its map, by deleting the map or its owner."""
+    return origin is not None and instance.map_id in _deleted_maps.get(origin, ())
+
+
+@receiver(post_delete, sender=MapPin)
+def record_deleted_pin(sender, instance, origin=None, **kwargs):
+    """Record a deleted pin on its map's counters and version, leave a tombstone and publish it."""
+    if isinstance(origin, MapPinQuerySet):
+        # Recorded once per map by MapPinQuerySet.delete()
+        origin.deleted_pins[instance.map_id].append(instance.pk)
+        return
+    # Pins deleted along with their map need no counters, tombstone or event
+    if deleted_with_map(instance, origin):
+        return
+    Map.record_change(instance.map_id, pins=-1)
+    MapPinTombstone.objects.create(map_id=instance.map_id, pin_id=instance.pk)
+    publish_pin_event(instance.map_id, 'deleted', [{'id': str(instance.pk)}])
+
+
+@receiver(post_save, sender=MapCollaborator)
+def record_saved_collaborator(sender, instance, created, **kwargs):
+    """Record an added collaborator on the map and the user's access sets."""
+    if created:
+        Map.record_change(instance.map_id, collaborators=1)
+    invalidate_map_access(instance.user_id)
+
+
+@receiver(post_delete, sender=MapCollaborator)
+def record_deleted_collaborator(sender, instance, origin=None, **kwargs):
+    """Record a removed collaborator on the map and the user's access sets."""
+    if not deleted_with_map(instance, origin):
+        Map.record_change(instance.map_id, collaborators=-1)
+    invalidate_map_access(instance.user_id)
+
+
+@receiver(post_save, sender=Map)
+@receiver(post_delete, sender=Map)
+def invalidate_owner_access(sender, instance, **kwargs):
+    """Drop the owner's cached access sets when one of their maps changes, and the old owner's on a transfer."""
+    loaded_owner_id = getattr(instance, '_loaded_owner_id', None)
+    if loaded_owner_id is not None and loaded_owner_id != instance.owner_id:
+        invalidate_map_access(loaded_owner_id, instance.owner_id)
+    else:
+        invalidate_map_access(instance.owner_id)
+    instance._loaded_owner_id = instance.owner_id
@@ -0,0 +1,98 @@
+"""
+Unique map slug allocation.
+
+A slug is its base when that is free, otherwise the base with the next
+numeric suffix after the highest one in use (``base-1``, ``base-2``, ...).
+The free slug is found with a single aggregate query however many maps
+share the base, and :func:`create_with_unique_slug` retries on the
+``IntegrityError`` of a concurrent insert that took the same slug.
+"""
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Count, Max, Q
+from django.db.models.functions import Cast, Substr
+
+from geosocial.maps.models import Map
+
+# Widest numeric suffix considered, so the cast cannot overflow
+MAX_SUFFIX_DIGITS = 9
+SLUG_MAX_LENGTH = Map._meta.get_field('slug').max_length
+# Attempts before a slug collision is reported
+MAX_ATTEMPTS = 5
+
+
+def slug_base(value):
+    """Truncate a base slug so that any suffix still fits the slug column."""
+    return value[:SLUG_MAX_LENGTH - MAX_SUFFIX_DIGITS - 1]
+
+
+def unique_slug(base_slug):
+    """Return ``base_slug`` or its next free numeric variant."""
+    base_slug = slug_base(base_slug)
+    usage = Map.objects.filter(
+        Q(slug=base_slug)
+        | Q(slug__regex=rf'^{re.escape(base_slug)}-[0-9]{{1,{MAX_SUFFIX_DIGITS}}}$')
+    ).aggregate(
+        base_taken=Count('pk', filter=Q(slug=base_slug)),
+        max_suffix=Max(
+            Cast(Substr('slug', len(base_slug) + 2), BigIntegerField()),
+            filter=~Q(slug=base_slug),
+        ),
+    )
+    if not usage['base_taken']:
+        return base_slug
+    return f"{base_slug}-{(usage['max_suffix'] or 0) + 1}"
+
+
+def create_with_unique_slug(base_slug, create):
+    """
+    Call ``create(slug)`` with a free slug, retrying if a concurrent insert took it.
+
+    Each attempt runs in a savepoint so a collision leaves the surrounding
+    transaction usable. Returns what ``create`` returns.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                return create(unique_slug(base_slug))
+        except IntegrityError:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+
+
+def unique_slugs(base_slugs):
+    """
+    Return a free slug for each of many bases, with a single query.
+
+    Slugs are allocated in order, so repeated bases get increasing suffixes.
+    Unlike :func:`unique_slug` this fetches every slug in use under the
+    bases, which is cheap when, as for new users, few of them collide.
+    """
+    bases = [slug_base(base_slug) for base_slug in base_slugs]
+    distinct = set(bases)
+    if not distinct:
+        return []
+    alternation = '|'.join(re.escape(base_slug) for base_slug in distinct)
+    used = set(Map.objects.filter(
+        Q(slug__in=distinct)
+        | Q(slug__regex=rf'^({alternation})-[0-9]{{1,{MAX_SUFFIX_DIGITS}}}$')
+    ).values_list('slug', flat=True))
+
+    max_suffix = {}
+    suffixed = re.compile(rf'(.*)-([0-9]{{1,{MAX_SUFFIX_DIGITS}}})')
+    for slug in used:
+        match = suffixed.fullmatch(slug)
+        if match and match[1] in distinct:
+            max_suffix[match[1]] = max(max_suffix.get(match[1], 0), int(match[2]))
+
+    slugs = []
+    for base_slug in bases:
+        slug = base_slug
+        # Also skips slugs allocated earlier in this call under another base
+        while slug in used:
+            max_suffix[base_slug] = max_suffix.get(base_slug, 0) + 1
+            slug = f'{base_slug}-{max_suffix[base_slug]}'
+        used.add(slug)
+        slugs.append(slug)
+    return slugs
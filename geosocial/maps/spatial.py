@@ -0,0 +1,415 @@
+import heapq
+import math
+import uuid
+from collections import Counter
+from decimal import Decimal
+from typing import NamedTuple
+
+from django.db.models import CharField, Count, FloatField, IntegerField, Max, Q, Sum, Value
+from django.db.models.functions import Cast, Floor
+
+MAX_ZOOM = 22
+
+# Mean earth radius in metres used for great-circle distances.
+EARTH_RADIUS_M = 6371008.8
+# Largest possible great-circle distance; a search this wide covers the globe.
+MAX_DISTANCE_M = math.pi * EARTH_RADIUS_M
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 12
+# Upper bound on geohash cells used to cover one bounding box before adjacent
+# cells are merged into ranges.
+GEOHASH_MAX_CELLS = 32
+
+
+class BoundingBox(NamedTuple):
+    """Viewport bounding box in WGS84 degrees."""
+    min_lon: float
+    min_lat: float
+    max_lon: float
+    max_lat: float
+
+    @classmethod
+    def from_string(cls, value):
+        """
+        Parse a ``minLon,minLat,maxLon,maxLat`` query parameter.
+
+        A box whose ``minLon`` is greater than its ``maxLon`` crosses the
+        antimeridian. Raises ``ValueError`` with a user-facing message when
+        the value is malformed or out of range.
+        """
+        parts = value.split(',')
+        if len(parts) != 4:
+            raise ValueError("bbox must be minLon,minLat,maxLon,maxLat.")
+        try:
+            min_lon, min_lat, max_lon, max_lat = (float(part) for part in parts)
+        except ValueError:
+            raise ValueError("bbox values must be numbers.") from None
+        if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+            raise ValueError("bbox longitudes must be between -180 and 180.")
+        if not (-90 <= min_lat <= 90 and -90 <= max_lat <= 90):
+            raise ValueError("bbox latitudes must be between -90 and 90.")
+        if min_lat > max_lat:
+            raise ValueError("bbox minLat must not be greater than maxLat.")
+        return cls(min_lon, min_lat, max_lon, max_lat)
+
+    @property
+    def crosses_antimeridian(self):
+        """Whether the box wraps around the 180th meridian."""
+        return self.min_lon > self.max_lon
+
+    def split(self):
+        """Return the box as one or two non-wrapping boxes."""
+        if not self.crosses_antimeridian:
+            return [self]
+        return [
+            BoundingBox(self.min_lon, self.min_lat, 180.0, self.max_lat),
+            BoundingBox(-180.0, self.min_lat, self.max_lon, self.max_lat),
+        ]
+
+    def contains(self, lat, lon):
+        """Check whether a point lies inside the box."""
+        lat, lon = float(lat), float(lon)
+        if not self.min_lat <= lat <= self.max_lat:
+            return False
+        if self.crosses_antimeridian:
+            return lon >= self.min_lon or lon <= self.max_lon
+        return self.min_lon <= lon <= self.max_lon
+
+    def to_q(self, prefix=''):
+        """
+        Build a filter matching pins inside this box.
+
+        Each non-wrapping part is covered by a few ``geohash`` ranges, which
+        the database answers with index range scans, and then checked
+        exactly against ``latitude``/``longitude`` because geohash cells
+        overshoot the box edges.
+        """
+        query = Q()
+        for part in self.split():
+            part_query = Q(**{
+                f'{prefix}latitude__gte': _decimal(part.min_lat),
+                f'{prefix}latitude__lte': _decimal(part.max_lat),
+                f'{prefix}longitude__gte': _decimal(part.min_lon),
+                f'{prefix}longitude__lte': _decimal(part.max_lon),
+            })
+            query |= geohash_ranges_q(geohash_ranges(part), prefix) & part_query
+        return query
+
+
+def parse_point(lat, lon):
+    """
+    Parse a latitude/longitude pair from query parameters.
+
+    Raises ``ValueError`` with a user-facing message when either value is
+    missing, not a number or out of range.
+    """
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        raise ValueError("lat and lon must be numbers.") from None
+    if not (math.isfinite(lat) and -90 <= lat <= 90):
+        raise ValueError("lat must be between -90 and 90.")
+    if not (math.isfinite(lon) and -180 <= lon <= 180):
+        raise ValueError("lon must be between -180 and 180.")
+    return lat, lon
+
+
+def parse_near(near, radius_m, max_radius_m=MAX_DISTANCE_M):
+    """
+    Parse the ``near=lat,lon`` and ``radius_m`` query parameters.
+
+    Raises ``ValueError`` with a user-facing message when either value is
+    malformed or out of range, including a radius above ``max_radius_m``.
+    """
+    parts = near.split(',')
+    if len(parts) != 2:
+        raise ValueError("near must be lat,lon.")
+    lat, lon = parse_point(*parts)
+    try:
+        radius = float(radius_m)
+    except (TypeError, ValueError):
+        raise ValueError("radius_m must be a number.") from None
+    if not 0 < radius <= max_radius_m:
+        raise ValueError(f"radius_m must be between 0 and {max_radius_m:.0f}.")
+    return lat, lon, radius
+
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres between two points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, map(float, (lat1, lon1, lat2, lon2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bbox_around(lat, lon, radius_m):
+    """
+    Return the smallest bounding box containing a circle on the sphere.
+
+    The box spans every longitude when the circle reaches a pole, and crosses
+    the antimeridian when the circle does.
+    """
+    angular = radius_m / EARTH_RADIUS_M
+    delta_lat = math.degrees(angular)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return BoundingBox(-180.0, max(min_lat, -90.0), 180.0, min(max_lat, 90.0))
+
+    ratio = math.sin(angular) / math.cos(math.radians(lat))
+    delta_lon = 180.0 if ratio >= 1 else math.degrees(math.asin(ratio))
+    if delta_lon >= 180.0:
+        return BoundingBox(-180.0, min_lat, 180.0, max_lat)
+    min_lon, max_lon = lon - delta_lon, lon + delta_lon
+    if min_lon < -180.0:
+        min_lon += 360.0
+    if max_lon > 180.0:
+        max_lon -= 360.0
+    return BoundingBox(min_lon, min_lat, max_lon, max_lat)
+
+
+def circle_candidates(queryset, lat, lon, radius_m):
+    """Query ``(pk, latitude, longitude)`` of the pins in the bounding box of a circle."""
+    bbox = bbox_around(lat, lon, radius_m)
+    return queryset.filter(bbox.to_q()).values_list('pk', 'latitude', 'longitude')
+
+
+def within_radius(candidates, lat, lon, radius_m):
+    """Return ``(distance, pk)`` of the candidate rows inside a circle, nearest first."""
+    return sorted(
+        (distance, pk)
+        for distance, pk in _distances(candidates, lat, lon)
+        if distance <= radius_m
+    )
+
+
+def _distances(candidates, lat, lon):
+    """List ``(distance, pk)`` for ``(pk, latitude, longitude)`` rows."""
+    return [
+        (haversine_distance(lat, lon, pin_lat, pin_lon), pk)
+        for pk, pin_lat, pin_lon in candidates
+    ]
+
+
+def pins_within(queryset, lat, lon, radius_m):
+    """
+    Return ``(distance, pk)`` pairs of pins within a radius, nearest first.
+
+    Candidates come from an index-backed bounding box around the circle and
+    are then checked against the exact great-circle distance.
+    """
+    return within_radius(circle_candidates(queryset, lat, lon, radius_m), lat, lon, radius_m)
+
+
+def nearest_pins(queryset, lat, lon, k, initial_radius_m=1000.0):
+    """
+    Return the ``(distance, pk)`` pairs of the ``k`` pins closest to a point.
+
+    The search area starts as the bounding box of ``initial_radius_m`` and
+    doubles until it holds ``k`` pins within the radius, so each round is a
+    bbox index scan over a small neighbourhood instead of a sort of the whole
+    table by distance. Candidates are ranked by exact haversine distance.
+    """
+    radius = initial_radius_m
+    while True:
+        candidates = _distances(circle_candidates(queryset, lat, lon, radius), lat, lon)
+        # Only pins inside the circle are guaranteed to beat anything outside
+        # the box, so the result is final once k of them are found.
+        if radius >= MAX_DISTANCE_M or sum(d <= radius for d, _ in candidates) >= k:
+            return heapq.nsmallest(k, candidates)
+        radius = min(radius * 2, MAX_DISTANCE_M)
+
+
+def _decimal(value):
+    """Convert a coordinate to the precision stored on ``MapPin``."""
+    return Decimal(str(value)).quantize(Decimal('0.000001'))
+
+
+def _float(field):
+    """Cast a ``DecimalField`` coordinate for floating point arithmetic."""
+    return Cast(field, FloatField())
+
+
+def cluster_cell_size(zoom, cells_per_tile):
+    """Size in degrees of a clustering grid cell at a zoom level."""
+    return 360.0 / (2 ** zoom * cells_per_tile)
+
+
+def cluster_pins(queryset, zoom, cells_per_tile=8, limit=None):
+    """
+    Aggregate pins into square grid cells for a zoom level.
+
+    Counts and coordinate sums are computed in the database, grouped by cell,
+    icon and content type, so only one row per populated combination is
+    returned; the rows are then merged per cell. Each cluster has its pin
+    count, centroid, dominant ``icon`` and ``content_type`` and the id of one
+    representative pin.
+
+    With ``limit``, rows are read in cell order and reading stops one cluster
+    past the limit, so callers can tell when the clusters are truncated.
+    """
+    cell = Value(cluster_cell_size(zoom, cells_per_tile))
+    rows = (
+        queryset
+        .order_by()
+        .annotate(
+            cell_x=Cast(Floor((_float('longitude') + Value(180.0)) / cell), IntegerField()),
+            cell_y=Cast(Floor((_float('latitude') + Value(90.0)) / cell), IntegerField()),
+        )
+        .values('cell_x', 'cell_y', 'icon', 'content_type')
+        .annotate(
+            count=Count('id'),
+            latitude_sum=Sum('latitude'),
+            longitude_sum=Sum('longitude'),
+            pin_id=Max(Cast('id', CharField())),
+        )
+    )
+
+    if limit is not None:
+        rows = rows.order_by('cell_x', 'cell_y').iterator()
+
+    cells = {}
+    for row in rows:
+        key = (row['cell_x'], row['cell_y'])
+        cluster = cells.get(key)
+        if cluster is None:
+            if limit is not None and len(cells) > limit:
+                break
+            cluster = cells[key] = {
+                'count': 0,
+                'latitude_sum': 0.0,
+                'longitude_sum': 0.0,
+                'icons': Counter(),
+                'content_types': Counter(),
+                'pin_id': None,
+                'pin_group': 0,
+            }
+        cluster['count'] += row['count']
+        cluster['latitude_sum'] += float(row['latitude_sum'])
+        cluster['longitude_sum'] += float(row['longitude_sum'])
+        cluster['icons'][row['icon']] += row['count']
+        cluster['content_types'][row['content_type']] += row['count']
+        if row['count'] > cluster['pin_group']:
+            cluster['pin_group'] = row['count']
+            cluster['pin_id'] = row['pin_id']
+
+    return [
+        {
+            'count': cluster['count'],
+            'latitude': round(cluster['latitude_sum'] / cluster['count'], 6),
+            'longitude': round(cluster['longitude_sum'] / cluster['count'], 6),
+            'icon': cluster['icons'].most_common(1)[0][0],
+            'content_type': cluster['content_types'].most_common(1)[0][0],
+            'pin_id': str(uuid.UUID(cluster['pin_id'])),
+        }
+        for cluster in cells.values()
+    ]
+
+
+def encode_geohash(lat, lon, precision=GEOHASH_PRECISION):
+    """Encode a point as a base32 geohash string."""
+    lat, lon = float(lat), float(lon)
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, interval = (lon, lon_range) if even else (lat, lat_range)
+        mid = (interval[0] + interval[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            interval[0] = mid
+        else:
+            bits <<= 1
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision):
+    """Return the ``(longitude, latitude)`` size in degrees of a geohash cell."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 360.0 / 2 ** lon_bits, 180.0 / 2 ** lat_bits
+
+
+def _geohash_successor(prefix):
+    """Return the smallest geohash prefix sorting after every extension of ``prefix``."""
+    chars = list(prefix)
+    while chars:
+        index = GEOHASH_ALPHABET.index(chars[-1])
+        if index + 1 < len(GEOHASH_ALPHABET):
+            chars[-1] = GEOHASH_ALPHABET[index + 1]
+            return ''.join(chars)
+        chars.pop()
+    return None
+
+
+def _geohash_cover(bbox, precision):
+    """List the geohash cells of one precision that intersect a non-wrapping box."""
+    cell_lon, cell_lat = geohash_cell_size(precision)
+    max_x = int(360.0 / cell_lon) - 1
+    max_y = int(180.0 / cell_lat) - 1
+    x0 = min(int((bbox.min_lon + 180.0) // cell_lon), max_x)
+    x1 = min(int((bbox.max_lon + 180.0) // cell_lon), max_x)
+    y0 = min(int((bbox.min_lat + 90.0) // cell_lat), max_y)
+    y1 = min(int((bbox.max_lat + 90.0) // cell_lat), max_y)
+    if (x1 - x0 + 1) * (y1 - y0 + 1) > GEOHASH_MAX_CELLS:
+        return None
+    return sorted({
+        encode_geohash(
+            (y + 0.5) * cell_lat - 90.0,
+            (x + 0.5) * cell_lon - 180.0,
+            precision,
+        )
+        for x in range(x0, x1 + 1)
+        for y in range(y0, y1 + 1)
+    })
+
+
+def geohash_ranges(bbox):
+    """
+    Cover a non-wrapping box with ``[start, stop)`` geohash ranges.
+
+    The finest precision whose cover stays under ``GEOHASH_MAX_CELLS`` is
+    used, and cells that are adjacent in geohash order are merged, so a
+    viewport becomes a handful of index range scans. ``stop`` is ``None``
+    when a range runs to the end of the keyspace.
+    """
+    cells = _geohash_cover(bbox, 1)
+    for precision in range(2, GEOHASH_PRECISION + 1):
+        finer = _geohash_cover(bbox, precision)
+        if finer is None:
+            break
+        cells = finer
+
+    ranges = []
+    for cell in cells:
+        stop = _geohash_successor(cell)
+        if ranges and ranges[-1][1] == cell:
+            ranges[-1][1] = stop
+        else:
+            ranges.append([cell, stop])
+    return [tuple(value) for value in ranges]
+
+
+def geohash_ranges_q(ranges, prefix=''):
+    """Build a filter on ``geohash`` for a list of ``[start, stop)`` ranges."""
+    query = Q()
+    for start, stop in ranges:
+        if start == GEOHASH_ALPHABET[0] and stop is None:
+            return Q()
+        bounds = {f'{prefix}geohash__gte': start}
+        if stop is not None:
+            bounds[f'{prefix}geohash__lt'] = stop
+        query |= Q(**bounds)
+    return query
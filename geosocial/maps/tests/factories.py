@@ -0,0 +1,27 @@
+from factory import Faker, SelfAttribute, Sequence, SubFactory
+from factory.django import DjangoModelFactory
+
+from geosocial.maps.models import Map, MapPin
+from geosocial.users.tests.factories import UserFactory
+
+
+class MapFactory(DjangoModelFactory[Map]):
+    name = Faker('sentence', nb_words=3)
+    slug = Sequence(lambda n: f'map-{n}')
+    description = ''
+    owner = SubFactory(UserFactory)
+
+    class Meta:
+        model = Map
+
+
+class MapPinFactory(DjangoModelFactory[MapPin]):
+    map = SubFactory(MapFactory)
+    placed_by = SelfAttribute('map.owner')
+    name = Faker('word')
+    latitude = 1
+    longitude = 2
+    content_url = 'https://example.com/image.jpg'
+
+    class Meta:
+        model = MapPin
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from geosocial.maps.access import get_map_access
+from geosocial.maps.models import Map, MapCollaborator
+from geosocial.maps.tests.factories import MapFactory, MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class MapAccessTest(TestCase):
+    """Test the cached per-user map access sets."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = UserFactory(username='owner')
+        self.guest = UserFactory(username='guest')
+        self.map = Map.objects.get(owner=self.owner)
+
+    def test_access_sets(self):
+        """Test that owned and collaborated maps are resolved."""
+        access = get_map_access(self.owner)
+        self.assertTrue(access.is_owner(self.map))
+        self.assertFalse(get_map_access(self.guest).can_view(self.map))
+
+    def test_cached(self):
+        """Test that a cached access set needs no queries."""
+        get_map_access(self.guest)
+        with self.assertNumQueries(0):
+            get_map_access(self.guest)
+
+    def test_invalidated_by_collaboration(self):
+        """Test that adding and removing a collaborator refreshes the sets."""
+        get_map_access(self.guest)
+        collaborator = MapCollaborator.objects.create(map=self.map, user=self.guest)
+        access = get_map_access(self.guest)
+        self.assertTrue(access.can_contribute(self.map))
+        self.assertFalse(access.is_owner(self.map))
+
+        collaborator.delete()
+        self.assertFalse(get_map_access(self.guest).is_member(self.map))
+
+    def test_invalidated_by_new_map(self):
+        """Test that creating a map adds it to the owner's set."""
+        get_map_access(self.owner)
+        new_map = MapFactory(name='new', slug='new', owner=self.owner)
+        self.assertTrue(get_map_access(self.owner).is_owner(new_map))
+
+    def test_invalidated_by_transfer(self):
+        """Test that transferring a map refreshes the old and the new owner's sets."""
+        get_map_access(self.owner)
+        get_map_access(self.guest)
+        map_instance = Map.objects.get(pk=self.map.pk)
+        map_instance.owner = self.guest
+        map_instance.save()
+        self.assertFalse(get_map_access(self.owner).can_view(self.map))
+        self.assertTrue(get_map_access(self.guest).is_owner(self.map))
+
+    def test_pin_access(self):
+        """Test that collaborators can view private pins and others cannot."""
+        MapPinFactory(map=self.map, name='secret', latitude=1, longitude=1)
+        client = APIClient()
+        client.force_authenticate(self.guest)
+        self.assertEqual(client.get('/api/pins/').data['results'], [])
+        response = client.get('/api/pins/by_map/', {'map_slug': self.map.slug})
+        self.assertEqual(response.status_code, 403)
+
+        MapCollaborator.objects.create(map=self.map, user=self.guest)
+        self.assertEqual(len(client.get('/api/pins/').data['results']), 1)
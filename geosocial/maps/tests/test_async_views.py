@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from geosocial.maps.models import Map, MapCollaborator
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class AsyncReadViewTest(TestCase):
+    """Test that the async read views answer like their sync counterparts."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = UserFactory(username='cartographer')
+        self.map = Map.objects.get(owner=self.owner)
+        self.map.public_view = True
+        self.map.save()
+        self.collaborator = UserFactory(username='helper')
+        MapCollaborator.objects.create(map=self.map, user=self.collaborator)
+        for index in range(5):
+            MapPinFactory(map=self.map, name=f'pin {index}', latitude=index, longitude=index)
+        self.client.force_login(self.collaborator)
+
+    def assert_same(self, path, params=None, key=None):
+        sync = self.client.get(f'/api/{path}', params)
+        async_ = self.client.get(f'/api/async/{path}', params)
+        self.assertEqual(async_.status_code, sync.status_code)
+        sync_data, async_data = sync.json(), async_.json()
+        if key is not None:
+            sync_data, async_data = sync_data[key], async_data[key]
+        self.assertEqual(async_data, sync_data)
+        return async_
+
+    def test_responses_match_sync_views(self):
+        """Test map list, detail, public maps and pin listings against the sync API."""
+        self.assert_same('maps/')
+        self.assert_same('maps/', {'fields': 'slug,pins_count'})
+        self.assert_same('maps/public_maps/')
+        self.assert_same(f'maps/{self.map.slug}/')
+        self.assert_same(f'maps/{self.map.slug}/', {'omit': 'pins,collaborators'})
+        params = {'map_slug': self.map.slug}
+        self.assert_same('pins/by_map/', params, key='results')
+        self.assert_same('pins/by_map/', {**params, 'bbox': '0.5,0.5,3.5,3.5', 'fields': 'id,name'})
+        self.assert_same('pins/by_map/', {**params, 'near': '2,2', 'radius_m': 200000})
+
+    def test_pagination_follows_cursors(self):
+        """Test that the async listing pages through every pin in the sync order."""
+        sync_names = [pin['name'] for pin in self.client.get(
+            '/api/pins/by_map/', {'map_slug': self.map.slug, 'page_size': 10}
+        ).json()['results']]
+        names = []
+        url = f'/api/async/pins/by_map/?map_slug={self.map.slug}&page_size=2'
+        while url:
+            page = self.client.get(url).json()
+            names += [pin['name'] for pin in page['results']]
+            url = page['next']
+        self.assertEqual(names, sync_names)
+
+    def test_permissions_and_validators(self):
+        """Test authentication, view permission and conditional requests."""
+        detail = self.client.get(f'/api/async/maps/{self.map.slug}/')
+        response = self.client.get(f'/api/async/maps/{self.map.slug}/', HTTP_IF_NONE_MATCH=detail['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        private = Map.objects.get(owner=self.collaborator)
+        self.client.force_login(self.owner)
+        response = self.client.get('/api/async/pins/by_map/', {'map_slug': private.slug})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get(f'/api/async/maps/{private.slug}/').status_code, 404)
+
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/async/maps/').status_code, 401)
@@ -0,0 +1,61 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from geosocial.maps.api.pagination import MapPinCursorPagination
+
+
+User = get_user_model()
+
+
+class BenchmarkHotPathsCommandTest(TestCase):
+    """Test the hot path benchmark command."""
+
+    def test_records_and_compares_results(self):
+        """Test that results are written as JSON, compared, and the dataset rolled back."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            call_command('benchmark_hot_paths', sizes='5', repeat=1, output=path, stdout=io.StringIO())
+            with open(path, encoding='utf-8') as stream:
+                report = json.load(stream)
+            names = {result['name'] for result in report['results']}
+            self.assertEqual(names, {
+                'by_map_pages', 'list', 'my_maps', 'public_maps', 'MapDetailSerializer', 'create_user_default_map',
+            })
+            for result in report['results']:
+                self.assertEqual(result['size'], 5)
+                self.assertGreater(result['queries'], 0)
+            self.assertFalse(User.objects.filter(username__startswith='benchmark-').exists())
+
+            out = io.StringIO()
+            call_command(
+                'benchmark_hot_paths', sizes='5', repeat=1, compare=path, tolerance=1000, stdout=out,
+            )
+            self.assertIn('No regressions', out.getvalue())
+
+            for result in report['results']:
+                result['queries'] = 0
+            with open(path, 'w', encoding='utf-8') as stream:
+                json.dump(report, stream)
+            with self.assertRaises(CommandError):
+                call_command('benchmark_hot_paths', sizes='5', repeat=1, compare=path, stdout=io.StringIO())
+
+    def test_by_map_walks_every_page(self):
+        """Test that the by_map benchmark follows the cursor through all pages."""
+        def by_map_queries():
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'results.json')
+                call_command('benchmark_hot_paths', sizes='5', repeat=1, output=path, stdout=io.StringIO())
+                with open(path, encoding='utf-8') as stream:
+                    results = json.load(stream)['results']
+            return next(result['queries'] for result in results if result['name'] == 'by_map_pages')
+
+        one_page = by_map_queries()
+        with mock.patch.object(MapPinCursorPagination, 'page_size', 2):
+            self.assertGreater(by_map_queries(), one_page)
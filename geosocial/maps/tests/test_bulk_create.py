@@ -0,0 +1,56 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map, MapPin
+from geosocial.users.tests.factories import UserFactory
+
+
+class MapPinBulkCreateTest(TestCase):
+    """Test creating many pins in one request."""
+
+    def setUp(self):
+        self.user = UserFactory(username='syncer')
+        self.map = Map.objects.get(owner=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def pin(self, name, lat=1, lon=2):
+        return {
+            'name': name,
+            'latitude': lat,
+            'longitude': lon,
+            'content_url': 'https://example.com/image.jpg',
+        }
+
+    def test_bulk_create(self):
+        """Test that valid pins are created and invalid ones reported by index."""
+        response = self.client.post('/api/pins/bulk_create/', {
+            'map': str(self.map.id),
+            'pins': [self.pin('a'), self.pin('bad', lat=100), self.pin('c', lat=57.64911, lon=10.40744)],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['created']), 2)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertIn('latitude', response.data['errors'][0]['errors'])
+        pin = MapPin.objects.get(name='c')
+        self.assertEqual(pin.placed_by, self.user)
+        self.assertTrue(pin.geohash.startswith('u4pruydqqv'))
+
+    def test_bulk_create_permission(self):
+        """Test that pins cannot be bulk created on someone else's map."""
+        other = UserFactory(username='other')
+        response = self.client.post('/api/pins/bulk_create/', {
+            'map': str(Map.objects.get(owner=other).id),
+            'pins': [self.pin('a')],
+        }, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(MapPin.objects.exists())
+
+    def test_bulk_create_all_invalid(self):
+        """Test that a request without any valid pin is a client error."""
+        response = self.client.post('/api/pins/bulk_create/', {
+            'map': str(self.map.id),
+            'pins': [{'name': 'no coordinates'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], [])
@@ -0,0 +1,65 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class MapClusterTest(TestCase):
+    """Test the zoom-aware pin clustering endpoint."""
+
+    def setUp(self):
+        self.user = UserFactory(username='clusterer')
+        self.map = Map.objects.get(owner=self.user)
+        pins = [
+            ('a', 51.50, -0.12, 'camera'),
+            ('b', 51.51, -0.13, 'camera'),
+            ('c', 51.52, -0.11, 'mic'),
+            ('d', -33.86, 151.21, 'point'),
+        ]
+        for name, lat, lon, icon in pins:
+            MapPinFactory(map=self.map, name=name, latitude=lat, longitude=lon, icon=icon)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/maps/{self.map.slug}/clusters/'
+
+    def test_world_view(self):
+        """Test that nearby pins collapse into one cluster at low zoom."""
+        response = self.client.get(self.url, {'z': 0})
+        self.assertEqual(response.status_code, 200)
+        clusters = sorted(response.data['clusters'], key=lambda c: c['count'])
+        self.assertEqual([c['count'] for c in clusters], [1, 3])
+        london = clusters[1]
+        self.assertEqual(london['icon'], 'camera')
+        self.assertAlmostEqual(london['latitude'], 51.51, places=4)
+        self.assertIn(
+            london['pin_id'],
+            [str(pk) for pk in self.map.pins.filter(icon='camera').values_list('id', flat=True)]
+        )
+
+    def test_bbox(self):
+        """Test that clusters are limited to the requested viewport."""
+        response = self.client.get(self.url, {'z': 2, 'bbox': '100,-50,180,0'})
+        self.assertEqual(len(response.data['clusters']), 1)
+        self.assertEqual(response.data['clusters'][0]['count'], 1)
+
+    def test_invalid_zoom(self):
+        """Test that a missing or out-of-range zoom is a client error."""
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'z': 40}).status_code, 400)
+
+    def test_cluster_limit(self):
+        """Test that clusters past MAPS_BBOX_PIN_LIMIT are dropped and flagged."""
+        self.assertFalse(self.client.get(self.url, {'z': 0}).data['truncated'])
+
+        with override_settings(MAPS_BBOX_PIN_LIMIT=1):
+            response = self.client.get(self.url, {'z': 0})
+        self.assertTrue(response.data['truncated'])
+        # The kept cluster still merges all of its icon groups
+        self.assertEqual([c['count'] for c in response.data['clusters']], [3])
+
+        with override_settings(MAPS_BBOX_PIN_LIMIT=2):
+            response = self.client.get(self.url, {'z': 20})
+        self.assertTrue(response.data['truncated'])
+        self.assertEqual(len(response.data['clusters']), 2)
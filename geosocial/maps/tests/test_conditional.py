@@ -0,0 +1,56 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map, MapCollaborator
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class ConditionalReadTest(TestCase):
+    """Test ETag validators and 304 responses for map reads."""
+
+    def setUp(self):
+        self.user = UserFactory(username='poller')
+        self.map = Map.objects.get(owner=self.user)
+        self.pin = MapPinFactory(map=self.map, name='pin', latitude=1, longitude=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.params = {'map_slug': self.map.slug}
+
+    def test_version_bumped_by_changes(self):
+        """Test that pin and collaborator changes bump the map version."""
+        self.map.refresh_from_db()
+        version = self.map.content_version
+        self.pin.name = 'renamed'
+        self.pin.save()
+        other = UserFactory(username='pollee')
+        MapCollaborator.objects.create(map=self.map, user=other)
+        self.pin.delete()
+        self.map.refresh_from_db()
+        self.assertEqual(self.map.content_version, version + 3)
+
+    def test_by_map_not_modified(self):
+        """Test that a matching If-None-Match is answered without pin queries."""
+        response = self.client.get('/api/pins/by_map/', self.params)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/pins/by_map/', self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(any('"maps_mappin"' in query['sql'] for query in queries))
+
+        MapPinFactory(map=self.map, name='new', latitude=2, longitude=2)
+        response = self.client.get('/api/pins/by_map/', self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_retrieve_and_export_not_modified(self):
+        """Test conditional requests on map detail and export."""
+        for url in [f'/api/maps/{self.map.slug}/', f'/api/maps/{self.map.slug}/export.geojson/']:
+            etag = self.client.get(url)['ETag']
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
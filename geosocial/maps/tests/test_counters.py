@@ -0,0 +1,106 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map, MapCollaborator, MapPin, MapPinTombstone
+from geosocial.maps.tests.factories import MapFactory, MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class MapCounterTest(TestCase):
+    """Test the denormalized pin and collaborator counters on maps."""
+
+    def setUp(self):
+        self.user = UserFactory(username='counter')
+        self.other = UserFactory(username='counted')
+        self.map = Map.objects.get(owner=self.user)
+
+    def test_pin_counter(self):
+        """Test that creating, moving and deleting pins updates the counters."""
+        pin = MapPinFactory(map=self.map)
+        MapPinFactory(map=self.map)
+        self.map.refresh_from_db()
+        self.assertEqual(self.map.pins_count, 2)
+
+        other_map = Map.objects.get(owner=self.other)
+        pin = MapPin.objects.get(pk=pin.pk)
+        pin.map = other_map
+        pin.save()
+        other_map.refresh_from_db()
+        self.map.refresh_from_db()
+        self.assertEqual((self.map.pins_count, other_map.pins_count), (1, 1))
+
+        MapPin.objects.all().delete()
+        self.map.refresh_from_db()
+        self.assertEqual(self.map.pins_count, 0)
+
+    def test_collaborator_counter(self):
+        """Test that adding and removing collaborators updates the counter."""
+        collaborator = MapCollaborator.objects.create(map=self.map, user=self.other)
+        self.map.refresh_from_db()
+        self.assertEqual(self.map.collaborators_count, 1)
+        collaborator.delete()
+        self.map.refresh_from_db()
+        self.assertEqual(self.map.collaborators_count, 0)
+
+    def test_cascading_deletes_skip_counters(self):
+        """Test that pins and collaborators deleted with their map or owner update no counters."""
+        doomed = MapFactory(name='doomed', slug='doomed', owner=self.user)
+        MapPinFactory.create_batch(5, map=doomed)
+        MapCollaborator.objects.create(map=doomed, user=self.other)
+        with CaptureQueriesContext(connection) as queries:
+            doomed.delete()
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+        self.assertFalse(MapPinTombstone.objects.filter(map_id=doomed.pk).exists())
+
+        # The owner's pins on someone else's map are still recorded there
+        other_map = Map.objects.get(owner=self.other)
+        MapPinFactory(map=other_map, placed_by=self.user)
+        MapPinFactory(map=self.map)
+        self.user.delete()
+        other_map.refresh_from_db()
+        self.assertEqual(other_map.pins_count, 0)
+        self.assertEqual(MapPinTombstone.objects.filter(map=other_map).count(), 1)
+
+    def test_queryset_delete_records_once_per_map(self):
+        """Test that a queryset delete updates each map's counter once."""
+        other_map = Map.objects.get(owner=self.other)
+        for map_instance in (self.map, self.map, self.map, other_map, other_map):
+            MapPinFactory(map=map_instance)
+        with CaptureQueriesContext(connection) as queries:
+            MapPin.objects.all().delete()
+        updates = [query for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.map.refresh_from_db()
+        other_map.refresh_from_db()
+        self.assertEqual((self.map.pins_count, other_map.pins_count), (0, 0))
+        self.assertEqual(MapPinTombstone.objects.filter(map=self.map).count(), 3)
+        self.assertEqual(MapPinTombstone.objects.filter(map=other_map).count(), 2)
+
+    def test_list_query_count(self):
+        """Test that listing maps does not count pins per map."""
+        MapPinFactory.create_batch(3, map=self.map)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as single:
+            response = client.get('/api/maps/my_maps/')
+        self.assertEqual(response.data[0]['pins_count'], 3)
+
+        for index in range(3):
+            MapFactory(name='extra', slug=f'extra-{index}', owner=self.user)
+        with CaptureQueriesContext(connection) as several:
+            response = client.get('/api/maps/my_maps/')
+        self.assertEqual(len(response.data), 4)
+        self.assertEqual(len(several), len(single))
+
+    def test_reconcile(self):
+        """Test that the reconcile command repairs drifted counters."""
+        MapPinFactory(map=self.map)
+        Map.objects.filter(pk=self.map.pk).update(pins_count=7, collaborators_count=2)
+        call_command('reconcile_map_counters', batch_size=1, stdout=io.StringIO())
+        self.map.refresh_from_db()
+        self.assertEqual((self.map.pins_count, self.map.collaborators_count), (1, 0))
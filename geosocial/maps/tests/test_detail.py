@@ -0,0 +1,60 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map, MapPin
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class MapDetailTest(TestCase):
+    """Test the bounded map detail response."""
+
+    def setUp(self):
+        self.user = UserFactory(username='detailer')
+        self.map = Map.objects.get(owner=self.user)
+        for index in range(3):
+            MapPinFactory(map=self.map, name=f'pin {index}', latitude=10 + index, longitude=-20 - index)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/maps/{self.map.slug}/'
+
+    def test_first_page_of_pins(self):
+        """Test that only one page of pins is nested, with a link to the rest."""
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['pins_count'], 3)
+        self.assertEqual(response.data['extent'], [-22.0, 10.0, -20.0, 12.0])
+        pins = response.data['pins']
+        self.assertEqual(len(pins['results']), 2)
+        self.assertIn('/api/pins/by_map/', pins['next'])
+
+        rest = self.client.get(pins['next'])
+        names = [pin['name'] for pin in pins['results'] + rest.data['results']]
+        self.assertEqual(sorted(names), ['pin 0', 'pin 1', 'pin 2'])
+
+    def test_query_count_is_bounded(self):
+        """Test that more pins do not add queries to the detail response."""
+        # Warm the cached access sets so both requests do the same lookups
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        for index in range(5):
+            MapPinFactory(
+                map=self.map,
+                placed_by=UserFactory(username=f'placer{index}'),
+                name='more',
+                latitude=0,
+                longitude=0,
+            )
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.url)
+        self.assertEqual(len(many), len(few))
+
+    def test_empty_map_extent(self):
+        """Test that a map without pins has no extent."""
+        MapPin.objects.all().delete()
+        response = self.client.get(self.url)
+        self.assertIsNone(response.data['extent'])
+        self.assertIsNone(response.data['pins']['next'])
@@ -0,0 +1,85 @@
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+
+from geosocial.maps.events import channel_name, get_broker
+from geosocial.maps.models import Map, MapCollaborator
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+User = get_user_model()
+
+
+class PinEventTest(TestCase):
+    """Test real-time pin events and the event stream."""
+
+    def setUp(self):
+        self.user = UserFactory(username='listener')
+        self.map = Map.objects.get(owner=self.user)
+        self.url = f'/api/maps/{self.map.slug}/events/'
+
+    def test_pin_writes_publish_after_commit(self):
+        """Test that creating, editing and deleting a pin publish events on commit."""
+        with mock.patch.object(get_broker(), 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                pin = MapPinFactory(map=self.map, name='live', latitude=1, longitude=2)
+                self.assertFalse(publish.called)
+            pin.name = 'renamed'
+            with self.captureOnCommitCallbacks(execute=True):
+                pin.save()
+            # delete() clears the pk, so keep the id for the assertion
+            pin_id = str(pin.pk)
+            with self.captureOnCommitCallbacks(execute=True):
+                pin.delete()
+
+        channels = {args[0] for args, _kwargs in publish.call_args_list}
+        self.assertEqual(channels, {channel_name(self.map.pk)})
+        events = [json.loads(args[1]) for args, _kwargs in publish.call_args_list]
+        self.assertEqual([event['action'] for event in events], ['created', 'updated', 'deleted'])
+        self.assertEqual(events[0]['pins'][0]['longitude'], 2.0)
+        self.assertEqual(events[1]['pins'][0]['name'], 'renamed')
+        self.assertEqual(events[2]['pins'], [{'id': pin_id}])
+
+    async def test_stream_relays_events(self):
+        """Test that published events reach a subscribed client."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+
+        get_broker().publish(channel_name(self.map.pk), '{"action": "deleted", "pins": []}')
+        self.assertEqual(await anext(stream), b'data: {"action": "deleted", "pins": []}\n\n')
+        await stream.aclose()
+
+    def test_stream_unavailable_under_wsgi(self):
+        """Test that the stream answers 501 instead of holding a WSGI worker."""
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, 501)
+
+    @override_settings(MAPS_EVENT_ACCESS_CHECK_SECONDS=0)
+    async def test_stream_ends_when_access_is_revoked_on_a_busy_map(self):
+        """Test that access is re-checked even while events keep arriving."""
+        helper = await User.objects.acreate_user(username='helper', password='testpass123')
+        collaboration = await MapCollaborator.objects.acreate(map=self.map, user=helper)
+        await self.async_client.aforce_login(helper)
+        response = await self.async_client.get(self.url)
+        stream = aiter(response.streaming_content)
+        await anext(stream)
+
+        get_broker().publish(channel_name(self.map.pk), '{"action": "deleted", "pins": []}')
+        self.assertTrue((await anext(stream)).startswith(b'data:'))
+        await collaboration.adelete()
+        get_broker().publish(channel_name(self.map.pk), '{"action": "deleted", "pins": []}')
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+
+    async def test_stream_requires_view_permission(self):
+        """Test that anonymous users and non-members cannot subscribe to a private map."""
+        self.assertEqual((await self.async_client.get(self.url)).status_code, 401)
+        stranger = await User.objects.acreate_user(username='stranger', password='testpass123')
+        await self.async_client.aforce_login(stranger)
+        self.assertEqual((await self.async_client.get(self.url)).status_code, 404)
@@ -0,0 +1,41 @@
+import json
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from geosocial.maps.geojson import PIN_PROPERTIES, iter_feature_collection
+from geosocial.maps.models import Map
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class MapExportTest(TestCase):
+    """Test the streaming GeoJSON export of a map."""
+
+    def setUp(self):
+        self.user = UserFactory(username='exporter')
+        self.map = Map.objects.get(owner=self.user)
+        for index in range(3):
+            MapPinFactory(map=self.map, name=f'pin {index}', latitude=index, longitude=-index)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_export(self):
+        """Test that the export is a valid FeatureCollection of every pin."""
+        response = self.client.get(f'/api/maps/{self.map.slug}/export.geojson/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/geo+json')
+        collection = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(collection['type'], 'FeatureCollection')
+        features = sorted(collection['features'], key=lambda f: f['properties']['name'])
+        self.assertEqual(len(features), 3)
+        self.assertEqual(features[2]['geometry']['coordinates'], [-2.0, 2.0])
+        self.assertEqual(features[2]['properties']['placed_by'], 'exporter')
+
+    def test_export_batches(self):
+        """Test that features split across chunks still form valid JSON."""
+        rows = self.map.pins.values(*PIN_PROPERTIES, 'latitude', 'longitude')
+        chunks = list(iter_feature_collection(rows, batch_size=2))
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(len(json.loads(''.join(chunks))['features']), 3)
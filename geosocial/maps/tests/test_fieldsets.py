@@ -0,0 +1,67 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from factory import SubFactory
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class SparseFieldsetTest(TestCase):
+    """Test the fields and omit query parameters."""
+
+    def setUp(self):
+        self.user = UserFactory(username='sparse')
+        self.map = Map.objects.get(owner=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pin_fields(self):
+        """Test that only the requested pin fields are rendered."""
+        MapPinFactory(map=self.map, placed_by=UserFactory(username='placer'))
+        response = self.client.get('/api/pins/', {'fields': 'id,latitude,longitude,icon'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'latitude', 'longitude', 'icon'})
+
+        response = self.client.get('/api/pins/', {'omit': 'description,map_name'})
+        pin = response.data['results'][0]
+        self.assertNotIn('map_name', pin)
+        self.assertEqual(pin['placed_by'], 'placer')
+
+    def test_pin_fields_skip_lookups(self):
+        """Test that a sparse pin listing does not grow with related lookups."""
+        params = {'fields': 'id,latitude,longitude,icon'}
+        self.client.get('/api/pins/', params)
+        MapPinFactory(map=self.map, placed_by=SubFactory(UserFactory))
+        with CaptureQueriesContext(connection) as one:
+            self.client.get('/api/pins/', params)
+        MapPinFactory.create_batch(4, map=self.map, placed_by=SubFactory(UserFactory))
+        with CaptureQueriesContext(connection) as five:
+            self.client.get('/api/pins/', params)
+        self.assertEqual(len(five), len(one))
+        self.assertFalse(any('"users_user"' in query['sql'] for query in five))
+
+    def test_map_fields(self):
+        """Test that the map detail skips omitted nested data."""
+        response = self.client.get(f'/api/maps/{self.map.slug}/', {'omit': 'pins,collaborators'})
+        self.assertNotIn('pins', response.data)
+        self.assertIn('pins_count', response.data)
+
+        response = self.client.get('/api/maps/', {'fields': 'slug,name'})
+        self.assertEqual(set(response.data[0]), {'slug', 'name'})
+
+    def test_writes_ignore_fieldsets(self):
+        """Test that fields and omit cannot drop writable fields from a write."""
+        pin = {'name': 'a', 'latitude': 1, 'longitude': 2, 'content_url': 'https://example.com/a.jpg'}
+        response = self.client.post('/api/pins/?omit=map', {**pin, 'map': str(self.map.id)}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('map', response.data)
+
+        response = self.client.post(
+            '/api/pins/bulk_create/?fields=name', {'map': str(self.map.id), 'pins': [pin]}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.post('/api/pins/?omit=map', pin, format='json')
+        self.assertEqual(response.status_code, 400)
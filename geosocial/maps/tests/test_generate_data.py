@@ -0,0 +1,36 @@
+import io
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from geosocial.maps.models import Map, MapPin
+
+
+User = get_user_model()
+
+
+class GenerateDataCommandTest(TestCase):
+    """Test the synthetic dataset generator."""
+
+    def test_generates_consistent_dataset(self):
+        """Test that counts match the options and the map counters match the rows."""
+        out = io.StringIO()
+        call_command(
+            'generate_geosocial_data', users=5, maps_per_user=2, pins_per_map=10,
+            collaborators_per_map=1, hotspots=3, seed=7, batch_size=7, stdout=out,
+        )
+        maps = Map.objects.filter(owner__username__startswith='synthetic-user-')
+        self.assertEqual(User.objects.filter(username__startswith='synthetic-user-').count(), 5)
+        self.assertEqual(maps.count(), 15)
+        self.assertEqual(MapPin.objects.filter(map__in=maps).count(), sum(m.pins_count for m in maps))
+        for map_instance in maps:
+            self.assertEqual(map_instance.pins_count, map_instance.pins.count())
+            self.assertEqual(map_instance.collaborators_count, map_instance.collaborators.count())
+        pin = MapPin.objects.filter(map__in=maps).first()
+        self.assertTrue(-90 <= pin.latitude <= 90 and -180 <= pin.longitude <= 180)
+        self.assertEqual(len(pin.geohash), 12)
+        self.assertIn('Generated 5 users, 15 maps', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('generate_geosocial_data', users=5, stdout=io.StringIO())
@@ -0,0 +1,56 @@
+import random
+
+from django.test import TestCase
+
+from geosocial.maps.models import Map
+from geosocial.maps.spatial import BoundingBox, encode_geohash, geohash_ranges
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class GeohashTest(TestCase):
+    """Test the geohash spatial key and its range covers."""
+
+    def test_encode(self):
+        """Test encoding against a published reference value."""
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        self.assertEqual(len(encode_geohash(0, 0)), 12)
+
+    def test_ranges_cover_bbox(self):
+        """Test that every point inside a box falls in one of its ranges."""
+        rng = random.Random(4)
+        for _box in range(50):
+            lon = rng.uniform(-180, 170)
+            lat = rng.uniform(-90, 80)
+            bbox = BoundingBox(
+                lon, lat,
+                min(lon + rng.uniform(0.001, 10), 180), min(lat + rng.uniform(0.001, 10), 90)
+            )
+            ranges = geohash_ranges(bbox)
+            self.assertLessEqual(len(ranges), 32)
+            for _point in range(20):
+                geohash = encode_geohash(
+                    rng.uniform(bbox.min_lat, bbox.max_lat),
+                    rng.uniform(bbox.min_lon, bbox.max_lon),
+                )
+                self.assertTrue(any(
+                    start <= geohash and (stop is None or geohash < stop)
+                    for start, stop in ranges
+                ))
+
+    def test_pin_save_sets_geohash(self):
+        """Test that saving a pin keeps its geohash in sync."""
+        user = UserFactory(username='hasher')
+        pin = MapPinFactory(
+            map=Map.objects.get(owner=user),
+            name='pin',
+            latitude=57.64911,
+            longitude=10.40744,
+        )
+        self.assertTrue(pin.geohash.startswith('u4pruydqqv'))
+
+        pin.latitude = -33.86
+        pin.longitude = 151.21
+        pin.save(update_fields=['latitude', 'longitude'])
+        pin.refresh_from_db()
+        self.assertEqual(pin.geohash, encode_geohash(-33.86, 151.21))
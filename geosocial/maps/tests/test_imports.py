@@ -0,0 +1,77 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from geosocial.maps.models import Map, MapPin
+from geosocial.users.tests.factories import UserFactory
+
+
+class ImportPinsCommandTest(TestCase):
+    """Test the import_pins management command."""
+
+    def setUp(self):
+        self.user = UserFactory(username='importer')
+        self.map = Map.objects.get(owner=self.user)
+
+    def import_file(self, suffix, content, **options):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False) as handle:
+            handle.write(content)
+        self.addCleanup(os.unlink, handle.name)
+        call_command('import_pins', self.map.slug, handle.name, stdout=io.StringIO(), **options)
+
+    def test_import_csv(self):
+        """Test that valid CSV rows are imported and invalid ones skipped."""
+        self.import_file('.csv', (
+            'name,latitude,longitude,content_url,icon\n'
+            'a,57.64911,10.40744,https://example.com/a.jpg,camera\n'
+            'b,95,0,https://example.com/b.jpg,\n'
+            'c,1,2,https://example.com/c.jpg,rocket\n'
+        ))
+        pin = MapPin.objects.get()
+        self.assertEqual((pin.name, pin.icon, pin.placed_by), ('a', 'camera', self.user))
+        self.assertTrue(pin.geohash.startswith('u4pruydqqv'))
+        self.assertIsNotNone(pin.timestamp)
+
+    def test_import_geojson(self):
+        """Test that a FeatureCollection is streamed in across chunks."""
+        features = [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [index, -index]},
+                'properties': {'name': f'pin {index}', 'content_url': 'https://example.com/x.jpg'},
+            }
+            for index in range(5)
+        ]
+        content = json.dumps({'type': 'FeatureCollection', 'features': features})
+        self.import_file('.geojson', content, chunk_size=2)
+        self.assertEqual(self.map.pins.count(), 5)
+        self.assertEqual(float(self.map.pins.get(name='pin 3').latitude), -3)
+
+    def test_malformed_geojson_rows_are_skipped(self):
+        """Test that huge coordinates and non-string properties reject only their row."""
+        def feature(coordinates, **properties):
+            return {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': coordinates},
+                'properties': {'name': 'pin', 'content_url': 'https://example.com/x.jpg', **properties},
+            }
+        features = [
+            feature([1, 1e30]),
+            feature([1e30, 1]),
+            feature([1, 2], name=7),
+            feature([1, 2], content_type=['image']),
+            feature([1, 2], icon={'name': 'camera'}),
+            feature([1, 2], description=['text']),
+            feature([1, 2], name='kept'),
+        ]
+        self.import_file('.geojson', json.dumps({'type': 'FeatureCollection', 'features': features}))
+        self.assertEqual(list(self.map.pins.values_list('name', flat=True)), ['kept'])
+
+    def test_unknown_map(self):
+        """Test that a missing map is reported as a command error."""
+        with self.assertRaises(CommandError):
+            call_command('import_pins', 'nope', 'pins.csv')
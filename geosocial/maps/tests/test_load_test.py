@@ -0,0 +1,56 @@
+from unittest import mock
+
+from allauth.account.models import EmailAddress
+from django.core.cache import cache
+from django.core.management import CommandError
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework.throttling import ScopedRateThrottle
+
+from geosocial.maps.management.commands.load_test import Command as LoadTestCommand
+from geosocial.users.tests.factories import UserFactory
+
+
+class LoadTestCommandTest(TestCase):
+    """Test the load test command's token login route and result aggregation."""
+
+    def setUp(self):
+        self.addCleanup(cache.clear)
+
+    def test_token_login_route(self):
+        """Test that the token login used by the virtual users returns a token."""
+        user = UserFactory(username='loadtester', password='testpass123')
+        credentials = {'username': 'loadtester', 'password': 'testpass123'}
+        response = APIClient().post('/api/auth-token/', credentials, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        EmailAddress.objects.create(user=user, email=user.email, primary=True, verified=True)
+        response = APIClient().post('/api/auth-token/', credentials, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user_id'], user.pk)
+        self.assertTrue(response.json()['token'])
+
+    def test_token_login_throttled(self):
+        """Test that token logins are throttled per client."""
+        with mock.patch.object(ScopedRateThrottle, 'THROTTLE_RATES', {'auth_token': '1/minute'}):
+            statuses = [
+                APIClient().post('/api/auth-token/', {'username': 'x', 'password': 'y'}).status_code
+                for _ in range(2)
+            ]
+        self.assertEqual(statuses, [400, 429])
+
+    def test_summarize_and_mix(self):
+        """Test percentiles and error rates per scenario, and mix validation."""
+        records = [('poll', float(latency), latency != 100) for latency in range(1, 101)]
+        records.append(('login', 5.0, True))
+        results = {result['scenario']: result for result in LoadTestCommand.summarize(records, elapsed=10)}
+        self.assertEqual(results['poll']['requests'], 100)
+        self.assertEqual(results['poll']['error_rate'], 0.01)
+        self.assertAlmostEqual(results['poll']['p50_ms'], 50.5)
+        self.assertGreater(results['poll']['p99_ms'], results['poll']['p95_ms'])
+        self.assertEqual(results['login']['p99_ms'], 5.0)
+
+        self.assertEqual(LoadTestCommand().parse_mix('browse=3, poll=1'), {'browse': 3.0, 'poll': 1.0})
+        for mix in ('browse', 'fly=1', 'browse=0'):
+            with self.assertRaises(CommandError):
+                LoadTestCommand().parse_mix(mix)
@@ -0,0 +1,65 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map
+from geosocial.maps.spatial import bbox_around, haversine_distance
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class NearestPinTest(TestCase):
+    """Test the k-nearest-neighbour pin search."""
+
+    def setUp(self):
+        self.user = UserFactory(username='seeker')
+        self.map = Map.objects.get(owner=self.user)
+        for name, lat, lon in [
+            ('here', 51.5000, -0.1200),
+            ('close', 51.5010, -0.1210),
+            ('london', 51.5300, -0.1000),
+            ('paris', 48.8500, 2.3500),
+            ('fiji', -17.7000, 178.0000),
+        ]:
+            MapPinFactory(map=self.map, name=name, latitude=lat, longitude=lon)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_haversine_distance(self):
+        """Test great-circle distance against a known value."""
+        # London to Paris is roughly 344 km
+        self.assertAlmostEqual(haversine_distance(51.5, -0.12, 48.85, 2.35) / 1000, 344, delta=2)
+        self.assertEqual(haversine_distance(10, 10, 10, 10), 0)
+
+    def test_bbox_around(self):
+        """Test circle bounding boxes near the antimeridian and the poles."""
+        bbox = bbox_around(0, 179.99, 10000)
+        self.assertTrue(bbox.crosses_antimeridian)
+        self.assertTrue(bbox.contains(0, -179.99))
+        self.assertEqual(bbox_around(89.99, 0, 10000).min_lon, -180.0)
+
+    def test_nearest(self):
+        """Test that pins come back nearest first with their distance."""
+        response = self.client.get(
+            '/api/pins/nearest/', {'lat': 51.5, 'lon': -0.12, 'k': 3}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([pin['name'] for pin in response.data], ['here', 'close', 'london'])
+        self.assertEqual(response.data[0]['distance'], 0)
+        self.assertGreater(response.data[2]['distance'], response.data[1]['distance'])
+
+    def test_nearest_expands_across_the_globe(self):
+        """Test that the search widens until enough pins are found."""
+        response = self.client.get(
+            '/api/pins/nearest/',
+            {'lat': -17.7, 'lon': -179.0, 'k': 5, 'map_slug': self.map.slug}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['name'], 'fiji')
+        self.assertEqual(len(response.data), 5)
+
+    def test_nearest_invalid(self):
+        """Test that missing coordinates or a bad k are client errors."""
+        url = '/api/pins/nearest/'
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'lat': 0, 'lon': 200}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'lat': 0, 'lon': 0, 'k': 0}).status_code, 400)
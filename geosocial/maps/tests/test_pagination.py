@@ -0,0 +1,53 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map, MapPin
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class MapPinPaginationTest(TestCase):
+    """Test keyset pagination of pin listings."""
+
+    def setUp(self):
+        self.user = UserFactory(username='pager')
+        self.map = Map.objects.get(owner=self.user)
+        for index in range(5):
+            MapPinFactory(map=self.map, name=f'pin {index}', latitude=index, longitude=index)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_pages(self):
+        """Test that following next cursors visits every pin exactly once."""
+        response = self.client.get('/api/pins/', {'page_size': 2})
+        self.assertNotIn('count', response.data)
+        names = []
+        while True:
+            names += [pin['name'] for pin in response.data['results']]
+            if response.data['next'] is None:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(sorted(names), [f'pin {index}' for index in range(5)])
+
+    def test_identical_timestamps(self):
+        """Test that pins sharing a timestamp page by id, forwards and back, without OFFSET."""
+        MapPin.objects.update(timestamp=timezone.now())
+        # The async views authenticate through the session
+        self.client.force_login(self.user)
+        ordered = [str(pk) for pk in MapPin.objects.order_by('-id').values_list('pk', flat=True)]
+        for path in ('/api/pins/by_map/', '/api/async/pins/by_map/'):
+            url = f'{path}?map_slug={self.map.slug}&page_size=2'
+            ids = []
+            with CaptureQueriesContext(connection) as queries:
+                while url:
+                    page = self.client.get(url).json()
+                    ids += [pin['id'] for pin in page['results']]
+                    last, url = page, page['next']
+            self.assertEqual(ids, ordered)
+            self.assertFalse([query for query in queries if 'OFFSET' in query['sql']])
+
+            previous = self.client.get(last['previous']).json()
+            self.assertEqual([pin['id'] for pin in previous['results']], ordered[2:4])
@@ -0,0 +1,44 @@
+import io
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from geosocial.maps.api.serializers import MapPinSerializer, MapPinValuesSerializer
+from geosocial.maps.models import Map, MapPin
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class MapPinValuesSerializerTest(TestCase):
+    """Test that the values read path matches MapPinSerializer."""
+
+    def setUp(self):
+        self.user = UserFactory(username='values')
+        self.map = Map.objects.get(owner=self.user)
+        MapPinFactory(map=self.map, name='pin', description='', latitude=51.5, longitude=-0.12, icon='camera')
+
+    def test_same_output(self):
+        """Test full and sparse fieldsets against the model serializer."""
+        for options in [{}, {'fields': ['id', 'latitude', 'icon']}, {'omit': ['map_name']}]:
+            pin_values = MapPinValuesSerializer(**options)
+            rows = pin_values.values(MapPin.objects.all())
+            expected = MapPinSerializer(MapPin.objects.all(), many=True, **options).data
+            self.assertEqual(pin_values.to_representation(rows), expected)
+
+    def test_same_output_in_another_timezone(self):
+        """Test that precompiled datetime converters follow the active timezone."""
+        MapPin.objects.update(latitude=Decimal('-33.8688'), longitude=Decimal('151.2093'))
+        with timezone.override('Australia/Sydney'):
+            pin_values = MapPinValuesSerializer()
+            rows = pin_values.values(MapPin.objects.all())
+            expected = MapPinSerializer(MapPin.objects.all(), many=True).data
+            self.assertEqual(pin_values.to_representation(rows), expected)
+        self.assertFalse(expected[0]['timestamp'].endswith('Z'))
+
+    def test_benchmark_command(self):
+        """Test that the serialization benchmark runs."""
+        out = io.StringIO()
+        call_command('benchmark_pin_serialization', pins=10, repeat=1, stdout=out)
+        self.assertIn('per pin', out.getvalue())
@@ -0,0 +1,71 @@
+import io
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+
+from geosocial.maps.models import Map
+from geosocial.maps.provisioning import provision_users
+from geosocial.maps.slugs import unique_slugs
+from geosocial.maps.tests.factories import MapFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+User = get_user_model()
+
+
+class ProvisionUsersTest(TestCase):
+    """Test bulk user provisioning with default maps."""
+
+    def setUp(self):
+        self.existing = UserFactory(username='existing')
+
+    def provision(self, content, **options):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write(content)
+        self.addCleanup(os.unlink, handle.name)
+        call_command('provision_users', handle.name, stdout=io.StringIO(), **options)
+
+    def test_provision_users_with_default_maps(self):
+        """Test that each new user gets exactly one private map and duplicates are skipped."""
+        MapFactory(name='taken', slug='ann-private', owner=self.existing)
+        self.provision((
+            'username,email,name,password\n'
+            'ann,ann@example.com,Ann,secret-pass-1\n'
+            'bob,bob@example.com,Bob,\n'
+            'existing,x@example.com,,\n'
+            'ann,again@example.com,,\n'
+            'cy,,,\n'
+        ), batch_size=2, verified_emails=True)
+
+        ann, bob, cy = User.objects.filter(username__in=['ann', 'bob', 'cy']).order_by('username')
+        self.assertTrue(ann.check_password('secret-pass-1'))
+        self.assertFalse(bob.has_usable_password())
+        self.assertEqual(ann.email, 'ann@example.com')
+        self.assertTrue(ann.emailaddress_set.get().verified)
+        self.assertFalse(cy.emailaddress_set.exists())
+        # The signal did not also create maps for the bulk-created users
+        for user, slug in [(ann, 'ann-private-1'), (bob, 'bob-private'), (cy, 'cy-private')]:
+            default = Map.objects.get(owner=user)
+            self.assertEqual(default.slug, slug)
+            self.assertFalse(default.public_view)
+        self.assertEqual(Map.objects.filter(owner=self.existing).count(), 2)
+
+    def test_queries_per_batch_are_constant(self):
+        """Test that a batch takes the same number of queries however many users it holds."""
+        counts = []
+        for prefix, size in [('small', 2), ('large', 20)]:
+            rows = [{'username': f'{prefix}{index}'} for index in range(size)]
+            with CaptureQueriesContext(connection) as queries:
+                list(provision_users(rows, batch_size=size))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_unique_slugs(self):
+        """Test that bulk slug allocation skips taken slugs and repeated bases."""
+        MapFactory(name='a', slug='a', owner=self.existing)
+        self.assertEqual(unique_slugs(['a', 'a', 'a-1', 'b']), ['a-1', 'a-2', 'a-1-1', 'b'])
@@ -0,0 +1,66 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class MapPinRadiusTest(TestCase):
+    """Test the near/radius_m query mode of the pin endpoints."""
+
+    def setUp(self):
+        self.user = UserFactory(username='radius')
+        self.map = Map.objects.get(owner=self.user)
+        for name, lat, lon in [
+            ('centre', 51.5000, -0.1200),
+            ('corner', 51.5080, -0.1080),
+            ('edge', 51.5080, -0.1200),
+            ('paris', 48.8500, 2.3500),
+        ]:
+            MapPinFactory(map=self.map, name=name, latitude=lat, longitude=lon)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_by_map_radius(self):
+        """Test that pins in the bbox but outside the circle are dropped."""
+        response = self.client.get(
+            '/api/pins/by_map/',
+            {'map_slug': self.map.slug, 'near': '51.5,-0.12', 'radius_m': 1000}
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([pin['name'] for pin in results], ['centre', 'edge'])
+        self.assertEqual(results[0]['distance'], 0)
+        self.assertAlmostEqual(results[1]['distance'], 890, delta=5)
+        self.assertFalse(response.data['truncated'])
+
+    def test_list_radius_with_bbox(self):
+        """Test that radius and bbox filters combine."""
+        response = self.client.get(
+            '/api/pins/',
+            {'near': '51.5,-0.12', 'radius_m': 2000, 'bbox': '-0.115,51,0,52'}
+        )
+        self.assertEqual([pin['name'] for pin in response.data['results']], ['corner'])
+
+    def test_invalid_radius(self):
+        """Test that malformed near or radius_m values are client errors."""
+        for params in [
+            {'near': '51.5', 'radius_m': 10},
+            {'near': '51.5,-0.12'},
+            {'near': '51.5,-0.12', 'radius_m': -1},
+        ]:
+            self.assertEqual(self.client.get('/api/pins/', params).status_code, 400)
+
+    @override_settings(MAPS_MAX_RADIUS_M=1000)
+    def test_radius_capped(self):
+        """Test that a radius above MAPS_MAX_RADIUS_M is rejected before any pin is read."""
+        params = {'near': '0,0', 'radius_m': 20000000}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/pins/', params)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse([query for query in queries if 'maps_mappin' in query['sql']])
+        self.assertIn('1000', response.data['error'])
+        self.assertEqual(self.client.get('/api/pins/', {**params, 'radius_m': 1000}).status_code, 200)
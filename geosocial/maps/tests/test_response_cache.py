@@ -0,0 +1,82 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map
+from geosocial.maps.response_cache import response_cache_stats
+from geosocial.maps.tests.factories import MapFactory, MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+# The map page without the site layout, whose links are not all routed
+MAP_PAGE_TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {
+        'loaders': [('django.template.loaders.locmem.Loader', {'maps/map_detail.html': '{{ map.name }}'})],
+    },
+}]
+
+
+class ResponseCacheTest(TestCase):
+    """Test the versioned response cache for public map reads."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = UserFactory(username='publisher')
+        self.viewer = UserFactory(username='reader')
+        self.map = Map.objects.get(owner=self.owner)
+        self.map.public_view = True
+        self.map.save()
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+        self.params = {'map_slug': self.map.slug}
+
+    def test_by_map_cached_until_write(self):
+        """Test that public pin listings are cached and a write invalidates them."""
+        MapPinFactory(map=self.map, name='first')
+        self.assertEqual(self.client.get('/api/pins/by_map/', self.params)['X-Cache'], 'MISS')
+        response = self.client.get('/api/pins/by_map/', self.params)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(json.loads(response.content)['results'][0]['name'], 'first')
+
+        MapPinFactory(map=self.map, name='second')
+        response = self.client.get('/api/pins/by_map/', self.params)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results']), 2)
+
+        # Different query strings are different variants
+        other = self.client.get('/api/pins/by_map/', {**self.params, 'fields': 'id'})
+        self.assertEqual(other['X-Cache'], 'MISS')
+        self.assertEqual(response_cache_stats(), {'hits': 1, 'misses': 3})
+
+    def test_public_maps_cached(self):
+        """Test that the public map listing is cached until a public map changes."""
+        self.client.get('/api/maps/public_maps/')
+        self.assertEqual(self.client.get('/api/maps/public_maps/')['X-Cache'], 'HIT')
+        MapPinFactory(map=self.map, name='pin')
+        response = self.client.get('/api/maps/public_maps/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['pins_count'], 1)
+
+    def test_private_maps_not_cached(self):
+        """Test that private pin listings bypass the cache."""
+        self.client.force_authenticate(self.owner)
+        private = MapFactory(name='private', slug='private', owner=self.owner)
+        response = self.client.get('/api/pins/by_map/', {'map_slug': private.slug})
+        self.assertFalse(response.has_header('X-Cache'))
+
+    @override_settings(ROOT_URLCONF='geosocial.maps.tests.urls', TEMPLATES=MAP_PAGE_TEMPLATES)
+    def test_anonymous_map_page_variants(self):
+        """Test that cached map pages vary by language and skip visitors with a session."""
+        url = reverse('maps:detail', kwargs={'pk': self.map.pk})
+        client = Client()
+        self.assertEqual(client.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(client.get(url)['X-Cache'], 'HIT')
+        self.assertEqual(client.get(url, HTTP_ACCEPT_LANGUAGE='fr')['X-Cache'], 'MISS')
+
+        client.cookies[settings.SESSION_COOKIE_NAME] = 'pending-messages'
+        self.assertFalse(client.get(url).has_header('X-Cache'))
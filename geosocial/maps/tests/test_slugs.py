@@ -0,0 +1,43 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from geosocial.maps.models import Map
+from geosocial.maps.slugs import create_with_unique_slug, unique_slug
+from geosocial.maps.tests.factories import MapFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class SlugAllocatorTest(TestCase):
+    """Test unique map slug allocation."""
+
+    def setUp(self):
+        self.user = UserFactory(username='sluggard')
+
+    def create_map(self, slug):
+        return MapFactory(name=slug, slug=slug, owner=self.user)
+
+    def test_next_free_suffix_in_one_query(self):
+        """Test that the slug after the highest suffix is found with one query."""
+        self.assertEqual(unique_slug('trail'), 'trail')
+        for slug in ['trail', 'trail-1', 'trail-7', 'trail-name', 'trails']:
+            self.create_map(slug)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(unique_slug('trail'), 'trail-8')
+        self.assertEqual(len(queries), 1)
+
+    def test_default_map_slug_collision(self):
+        """Test that a taken default map slug gets a suffix."""
+        self.create_map('walker-private')
+        walker = UserFactory(username='walker')
+        self.assertEqual(Map.objects.get(owner=walker).slug, 'walker-private-1')
+
+    def test_retry_on_concurrent_insert(self):
+        """Test that a slug taken between allocation and insert is retried."""
+        self.create_map('race')
+        # The first allocation ran before another request inserted 'race'
+        with mock.patch('geosocial.maps.slugs.unique_slug', side_effect=['race', 'race-1']):
+            created = create_with_unique_slug('race', self.create_map)
+        self.assertEqual(created.slug, 'race-1')
@@ -0,0 +1,92 @@
+import io
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map, MapPinTombstone
+from geosocial.maps.tests.factories import MapFactory, MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+@override_settings(MAPS_SYNC_OVERLAP_SECONDS=0, MAPS_SYNC_PAGE_SIZE=2)
+class PinSyncTest(TestCase):
+    """Test the delta sync endpoint and pin tombstones."""
+
+    def setUp(self):
+        self.user = UserFactory(username='syncer')
+        self.map = Map.objects.get(owner=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/maps/{self.map.slug}/changes/'
+
+    def sync(self, since=None):
+        """Follow cursors until the sync is complete; return updated names and deleted ids."""
+        updated, deleted = [], []
+        while True:
+            response = self.client.get(self.url, {'since': since} if since else {})
+            self.assertEqual(response.status_code, 200)
+            updated += [pin['name'] for pin in response.data['updated']]
+            deleted += response.data['deleted']
+            since = response.data['cursor']
+            if response.data['complete']:
+                return updated, deleted, since
+
+    def test_initial_sync_pages_through_all_pins(self):
+        """Test that a sync without a cursor returns every pin once."""
+        for name in ['a', 'b', 'c', 'd', 'e']:
+            MapPinFactory(map=self.map, name=name)
+        updated, deleted, _cursor = self.sync()
+        self.assertEqual(sorted(updated), ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(deleted, [])
+
+    def test_incremental_sync(self):
+        """Test that only changes and deletions after the cursor are returned."""
+        kept = MapPinFactory(map=self.map, name='kept')
+        edited = MapPinFactory(map=self.map, name='edited')
+        removed = MapPinFactory(map=self.map, name='removed')
+        moved = MapPinFactory(map=self.map, name='moved')
+        _updated, _deleted, cursor = self.sync()
+
+        edited.name = 'renamed'
+        edited.save()
+        # delete() clears the pk, so keep the id for the assertion
+        removed_id = str(removed.pk)
+        removed.delete()
+        moved.map = MapFactory(name='other', slug='other', owner=self.user)
+        moved.save()
+
+        updated, deleted, _cursor = self.sync(cursor)
+        self.assertEqual(updated, ['renamed'])
+        self.assertEqual(sorted(deleted), sorted([removed_id, str(moved.pk)]))
+        self.assertNotIn(str(kept.pk), deleted)
+
+    def test_map_delete_writes_no_tombstones(self):
+        """Test that deleting a map does not leave tombstones for its pins."""
+        other = MapFactory(name='other', slug='other', owner=self.user)
+        MapPinFactory(map=other, name='pin')
+        other.delete()
+        self.assertFalse(MapPinTombstone.objects.exists())
+
+    def test_invalid_and_expired_cursor(self):
+        """Test that malformed cursors are rejected and stale ones must resync."""
+        self.assertEqual(self.client.get(self.url, {'since': 'nope'}).status_code, 400)
+        response = self.client.get(self.url, {'since': '1000000'})
+        self.assertEqual(response.status_code, 410)
+
+    def test_private_map_hidden(self):
+        """Test that users who cannot view a map cannot sync it."""
+        self.client.force_authenticate(UserFactory(username='stranger'))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_prune_pin_tombstones(self):
+        """Test that the prune command removes only expired tombstones."""
+        MapPinFactory(map=self.map, name='old').delete()
+        MapPinFactory(map=self.map, name='new').delete()
+        MapPinTombstone.objects.filter(pk=MapPinTombstone.objects.first().pk).update(
+            deleted_at=timezone.now() - timedelta(days=60)
+        )
+        call_command('prune_pin_tombstones', stdout=io.StringIO())
+        self.assertEqual(MapPinTombstone.objects.count(), 1)
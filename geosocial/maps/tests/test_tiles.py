@@ -0,0 +1,83 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map
+from geosocial.maps.mvt import encode_tile, tile_bounds, tile_coordinates
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class VectorTileTest(TestCase):
+    """Test vector tile encoding and the tiles endpoint."""
+
+    def setUp(self):
+        self.user = UserFactory(username='tiler')
+        self.map = Map.objects.get(owner=self.user)
+        self.pin = MapPinFactory(map=self.map, name='Null Island', latitude=1, longitude=1, icon='marker')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_tile_math(self):
+        """Test tile bounds and tile-local projection."""
+        bbox = tile_bounds(1, 1, 0)
+        self.assertEqual((bbox.min_lon, bbox.max_lon), (0.0, 180.0))
+        self.assertAlmostEqual(bbox.min_lat, 0.0)
+        self.assertEqual(tile_coordinates(0, 0, 0, 0, 0), (2048, 2048))
+        self.assertEqual(tile_coordinates(0, 0, 1, 1, 1), (0, 0))
+
+    def test_encode_tile(self):
+        """Test the protobuf layout of a single point feature."""
+        tile = encode_tile({'pins': [(1, -1, {'name': 'a'})]})
+        # Tile.layers (field 3, length-delimited)
+        self.assertEqual(tile[0], 0x1A)
+        self.assertEqual(tile[1], len(tile) - 2)
+        # Layer.version = 2, Layer.name = "pins"
+        self.assertEqual(tile[2:9], bytes([0x78, 0x02, 0x0A, 0x04]) + b'pin')
+        # MoveTo(1) with zigzag-encoded (1, -1)
+        self.assertIn(bytes([0x22, 0x03, 0x09, 0x02, 0x01]), tile)
+        self.assertIn(b'name', tile)
+
+    def test_tile_endpoint(self):
+        """Test that pins inside the tile are encoded with their attributes."""
+        response = self.client.get(f'/api/maps/{self.map.slug}/tiles/1/1/0.mvt/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.mapbox-vector-tile')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn(b'Null Island', response.content)
+        self.assertIn(str(self.pin.id).encode(), response.content)
+
+        response = self.client.get(f'/api/maps/{self.map.slug}/tiles/1/0/0.mvt/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b'Null Island', response.content)
+
+    def test_tile_out_of_range(self):
+        """Test that tile coordinates beyond the zoom level are rejected."""
+        response = self.client.get(f'/api/maps/{self.map.slug}/tiles/1/2/0.mvt/')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json(), {'error': 'Tile coordinates are out of range'})
+
+        response = self.client.get('/api/maps/missing/tiles/0/0/0.mvt/')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('detail', response.json())
+
+    def test_tile_revalidation(self):
+        """Test that tiles carry validators and answer conditional requests."""
+        url = f'/api/maps/{self.map.slug}/tiles/0/0/0.mvt/'
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('max-age', response['Cache-Control'])
+
+    def test_tile_truncated(self):
+        """Test that a tile over the pin limit is flagged as truncated."""
+        url = f'/api/maps/{self.map.slug}/tiles/0/0/0.mvt/'
+        self.assertNotIn('X-Truncated', self.client.get(url))
+
+        MapPinFactory(map=self.map, latitude=2, longitude=2)
+        with override_settings(MAPS_BBOX_PIN_LIMIT=1):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Truncated'], 'true')
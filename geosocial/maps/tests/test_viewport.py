@@ -0,0 +1,87 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from geosocial.maps.models import Map
+from geosocial.maps.spatial import BoundingBox
+from geosocial.maps.tests.factories import MapPinFactory
+from geosocial.users.tests.factories import UserFactory
+
+
+class BoundingBoxTest(TestCase):
+    """Test parsing and matching of viewport bounding boxes."""
+
+    def test_parse(self):
+        """Test that a well-formed bbox is parsed in lon/lat order."""
+        bbox = BoundingBox.from_string('-10,20,30,40')
+        self.assertEqual(bbox, BoundingBox(-10, 20, 30, 40))
+        self.assertFalse(bbox.crosses_antimeridian)
+
+    def test_parse_invalid(self):
+        """Test that malformed or out-of-range boxes are rejected."""
+        for value in ['1,2,3', 'a,b,c,d', '-190,0,10,10', '0,-95,10,10', '0,50,10,40']:
+            with self.assertRaises(ValueError):
+                BoundingBox.from_string(value)
+
+    def test_antimeridian(self):
+        """Test that a box with minLon > maxLon wraps around 180."""
+        bbox = BoundingBox.from_string('170,-10,-170,10')
+        self.assertTrue(bbox.crosses_antimeridian)
+        self.assertEqual(len(bbox.split()), 2)
+        self.assertTrue(bbox.contains(0, 175))
+        self.assertTrue(bbox.contains(0, -175))
+        self.assertFalse(bbox.contains(0, 0))
+
+
+class MapPinViewportTest(TestCase):
+    """Test the bbox query mode of the pin endpoints."""
+
+    def setUp(self):
+        self.user = UserFactory(username='pinner')
+        self.map = Map.objects.get(owner=self.user)
+        for name, lat, lon in [
+            ('london', 51.5, -0.12),
+            ('paris', 48.85, 2.35),
+            ('fiji', -17.7, 178.0),
+            ('samoa', -13.8, -172.1),
+        ]:
+            MapPinFactory(map=self.map, name=name, latitude=lat, longitude=lon)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_names(self, response):
+        return sorted(pin['name'] for pin in response.data['results'])
+
+    def test_by_map_without_bbox_is_paginated(self):
+        """Test that by_map returns a cursor page without bbox."""
+        response = self.client.get('/api/pins/by_map/', {'map_slug': self.map.slug})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertIsNone(response.data['next'])
+
+    def test_by_map_bbox(self):
+        """Test that only pins inside the viewport are returned."""
+        response = self.client.get(
+            '/api/pins/by_map/',
+            {'map_slug': self.map.slug, 'bbox': '-5,45,5,55'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_names(response), ['london', 'paris'])
+        self.assertFalse(response.data['truncated'])
+
+    def test_list_bbox_across_antimeridian(self):
+        """Test that a box crossing 180 matches pins on both sides."""
+        response = self.client.get('/api/pins/', {'bbox': '170,-30,-165,0'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_names(response), ['fiji', 'samoa'])
+
+    @override_settings(MAPS_BBOX_PIN_LIMIT=1)
+    def test_bbox_truncated(self):
+        """Test that results beyond the cap are dropped and flagged."""
+        response = self.client.get('/api/pins/', {'bbox': '-180,-90,180,90'})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertTrue(response.data['truncated'])
+
+    def test_invalid_bbox(self):
+        """Test that a malformed bbox is a client error."""
+        response = self.client.get('/api/pins/', {'bbox': 'nope'})
+        self.assertEqual(response.status_code, 400)
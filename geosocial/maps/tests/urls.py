@@ -0,0 +1,10 @@
+from django.urls import include
+from django.urls import path
+
+from config.urls import urlpatterns as project_urlpatterns
+
+# The project serves the SPA instead of the server-rendered map pages
+urlpatterns = [
+    path("maps/", include("geosocial.maps.urls")),
+    *project_urlpatterns,
+]
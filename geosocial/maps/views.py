@@ -1,6 +1,6 @@
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
@@ -8,8 +8,11 @@ from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import CreateView, DetailView, ListView, UpdateView, View
 
+from .access import request_map_access
 from .forms import MapForm, MapPinForm, MapShareForm
 from .models import Map, MapCollaborator
+from .response_cache import cached_response
+from .slugs import create_with_unique_slug
 
 
 class MapListView(LoginRequiredMixin, ListView):
@@ -21,18 +24,33 @@ class MapListView(LoginRequiredMixin, ListView):
 
     def get_queryset(self):
         """Get maps owned by or shared with the current user."""
-        return Map.objects.filter(
-            Q(owner=self.request.user) | 
-            Q(collaborators__user=self.request.user)
-        ).select_related('owner').prefetch_related('collaborators', 'pins').distinct()
+        access = request_map_access(self.request)
+        return Map.objects.filter(pk__in=access.members).select_related('owner')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['owned_maps'] = Map.objects.filter(owner=self.request.user).count()
-        context['shared_maps'] = Map.objects.filter(collaborators__user=self.request.user).count()
+        access = request_map_access(self.request)
+        context['owned_maps'] = len(access.owned)
+        context['shared_maps'] = len(access.collaborated)
         return context
 
 
+def can_share_cached_page(request):
+    """
+    Whether a page for this request may come from the shared response cache.
+
+    Only anonymous visitors without a session qualify: a session can carry
+    state into the page, and pending messages would be frozen into the
+    cached copy. Cookies set by middleware come too late for the cache to
+    notice, so this has to be decided from the request.
+    """
+    return (
+        not request.user.is_authenticated
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and not len(messages.get_messages(request))
+    )
+
+
 class MapDetailView(DetailView):
     """Detail view for individual maps."""
     model = Map
@@ -41,25 +59,32 @@ class MapDetailView(DetailView):
 
     def get_queryset(self):
         """Get maps that are public or owned/shared with the current user."""
-        if self.request.user.is_authenticated:
-            return Map.objects.filter(
-                Q(public_view=True) |
-                Q(owner=self.request.user) | 
-                Q(collaborators__user=self.request.user)
-            ).select_related('owner').prefetch_related('collaborators', 'pins__placed_by').distinct()
-        else:
-            return Map.objects.filter(public_view=True).select_related('owner').prefetch_related('pins__placed_by')
+        access = request_map_access(self.request)
+        return Map.objects.filter(
+            access.visible_maps_q()
+        ).select_related('owner').prefetch_related('pins__placed_by')
+
+    def get(self, request, *args, **kwargs):
+        """Serve public maps to anonymous visitors from the response cache."""
+        if not can_share_cached_page(request):
+            return super().get(request, *args, **kwargs)
+
+        public_map = Map.objects.filter(pk=kwargs['pk'], public_view=True).only(
+            'id', 'content_version', 'updated_at'
+        ).first()
+        if public_map is None:
+            return super().get(request, *args, **kwargs)
+        return cached_response(
+            request, f'map_detail:{public_map.pk}', public_map.version,
+            lambda: super(MapDetailView, self).get(request, *args, **kwargs).render()
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         map_obj = context['map']
         
         # Check user permissions
-        context['can_edit'] = (
-            self.request.user.is_authenticated and 
-            (map_obj.owner == self.request.user or 
-             map_obj.collaborators.filter(user=self.request.user).exists())
-        )
+        context['can_edit'] = request_map_access(self.request).is_member(map_obj)
         context['can_contribute'] = (
             map_obj.public_contribution or 
             (self.request.user.is_authenticated and context['can_edit'])
@@ -86,20 +111,15 @@ class MapCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         """Set the map owner and generate slug."""
         form.instance.owner = self.request.user
-        
+
+        def save(slug):
+            form.instance.slug = slug
+            return super(MapCreateView, self).form_valid(form)
+
         # Generate a unique slug
-        base_slug = slugify(form.instance.name)
-        slug = base_slug
-        counter = 1
-        
-        while Map.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-        
-        form.instance.slug = slug
-        
+        response = create_with_unique_slug(slugify(form.instance.name), save)
         messages.success(self.request, _('Map created successfully!'))
-        return super().form_valid(form)
+        return response
 
     def get_success_url(self):
         return reverse('maps:detail', kwargs={'pk': self.object.pk})
@@ -113,10 +133,7 @@ class MapUpdateView(LoginRequiredMixin, UpdateView):
 
     def get_queryset(self):
         """Only allow owners and collaborators to edit."""
-        return Map.objects.filter(
-            Q(owner=self.request.user) | 
-            Q(collaborators__user=self.request.user)
-        )
+        return Map.objects.filter(pk__in=request_map_access(self.request).members)
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()